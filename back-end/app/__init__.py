@@ -12,6 +12,10 @@ def create_app(config_name=None):
     """Application factory pattern for Flask app"""
     app = Flask(__name__)
     
+    # Native Decimal/date encoding, on orjson when it is installed
+    from app.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
+    
     # Import and use your config classes
     from app.config import config
     
@@ -32,6 +36,30 @@ def create_app(config_name=None):
     except ImportError as e:
         print(f"✗ Could not import API blueprint: {e}")
     
+    # Latency, SQL and upstream timing, exposed on /metrics
+    if app.config.get('METRICS_ENABLED'):
+        from app.services.metrics import init_metrics
+        init_metrics(app)
+    
+    # Opt-in cProfile capture; registers nothing when PROFILE_MODE is off
+    from app.services.profiling import init_profiling
+    init_profiling(app)
+    
+    # Fill the connection pool before serving traffic
+    if app.config.get('DB_POOL_WARMUP'):
+        from app.services.pool import warm_up_pool
+        try:
+            opened = warm_up_pool(app, app.config['DB_POOL_WARMUP'])
+            print(f"✓ Database pool warmed up with {opened} connections")
+        except Exception as e:
+            print(f"✗ Could not warm up database pool: {e}")
+    
+    # CLI commands
+    from app.services.snapshots import snapshots_cli
+    app.cli.add_command(snapshots_cli)
+    from app.services.profiling import profiling_cli
+    app.cli.add_command(profiling_cli)
+    
     # Test routes
     @app.route('/')
     def hello():
@@ -0,0 +1,98 @@
+import decimal
+from datetime import date, datetime, time
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional: the standard library encoder is used instead
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that encodes Decimal, date and datetime natively
+
+    Decimals become numbers and dates ISO 8601 strings, the same as the
+    models' to_dict() output, so rows can be returned without converting
+    each value first. Uses orjson when it is installed, which also encodes
+    NumPy arrays and scalars; otherwise falls back to the standard library
+    with the same type handling.
+    """
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, decimal.Decimal):
+            return float(o)
+        if isinstance(o, (datetime, date, time)):
+            return o.isoformat()
+        if hasattr(o, 'tolist'):
+            # NumPy arrays and scalars on the standard library path
+            return o.tolist()
+        return DefaultJSONProvider.default(o)
+
+    def _orjson_options(self, indent=None):
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        # orjson has no equivalent of most json.dumps arguments
+        if orjson is None or set(kwargs) - {'indent', 'separators'}:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._orjson_options(kwargs.get('indent'))).decode()
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        data = orjson.dumps(obj, default=self.default, option=self._orjson_options(indent))
+        return self._app.response_class(data + b'\n', mimetype=self.mimetype)
+
+
+def rows_response(columns, rows, **payload):
+    """
+    JSON response carrying query rows as arrays rather than objects
+
+    Rows are encoded as they come from the database, one array per row in
+    the order of columns, so no per-row dict is built.
+
+    Args:
+        columns: Column names, in row order
+        rows: Sequence of tuples or SQLAlchemy rows
+        **payload: Other top-level keys of the response
+
+    Returns:
+        Response: {'columns': [...], 'rows': [[...], ...], 'count': n, ...payload}
+    """
+    rows = [tuple(row) for row in rows]
+    return current_app.json.response({**payload, 'columns': list(columns), 'rows': rows, 'count': len(rows)})
+
+
+def embedded_json_response(key, raw_json, **payload):
+    """
+    JSON response with already-encoded JSON text placed under key
+
+    For arrays the database serialises itself: the body is assembled from
+    the encoded payload fields and the text as-is, instead of parsing the
+    text and encoding it again.
+
+    Args:
+        key: Top-level key for raw_json
+        raw_json: Valid JSON text, e.g. '[{"date": ...}, ...]'
+        **payload: Other top-level keys of the response
+
+    Returns:
+        Response: {...payload, key: raw_json}
+    """
+    dumps = current_app.json.dumps
+    fields = [f"{dumps(name)}:{dumps(value)}" for name, value in payload.items()]
+    fields.append(f"{dumps(key)}:{raw_json}")
+    return current_app.response_class(
+        "{" + ",".join(fields) + "}\n",
+        mimetype=current_app.json.mimetype
+    )
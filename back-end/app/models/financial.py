@@ -1,5 +1,5 @@
 from app import db
-from datetime import datetime
+from datetime import datetime, timedelta
 from sqlalchemy import text
 
 class FinancialStatement(db.Model):
@@ -16,6 +16,11 @@ class FinancialStatement(db.Model):
     # Relationship to KPI metrics
     kpi_metrics = db.relationship('KPIMetric', backref='statement', lazy=True)
     
+    __table_args__ = (
+        # /statements keyset pagination: newest upload first
+        db.Index('ix_financial_statements_upload_date_id', 'upload_date', 'id'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -37,6 +42,11 @@ class KPIMetric(db.Model):
     metric_category = db.Column(db.String(50))
     calculation_date = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        # /statements/<id>/kpis keyset pagination
+        db.Index('ix_kpi_metrics_statement_id_id', 'statement_id', 'id'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -61,6 +71,29 @@ class Investments (db.Model):
     value = db.Column(db.Numeric(15, 2))
     date_of_valuation = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # /investment-history: filter on investment, order by valuation date
+        db.Index('ix_investments_investment_date', 'investment', 'date_of_valuation'),
+        # Reports: range scans over a single valuation day
+        db.Index('ix_investments_date_of_valuation', 'date_of_valuation'),
+        # /unique-dates: DISTINCT date(date_of_valuation)
+        db.Index('ix_investments_valuation_day', db.func.date(date_of_valuation)),
+    )
+
+    @classmethod
+    def valuation_day(cls):
+        """Calendar day of the valuation, matching ix_investments_valuation_day"""
+        return db.func.date(cls.date_of_valuation, type_=db.Date)
+
+    @classmethod
+    def valued_on(cls, target_date):
+        """Index-friendly filter for rows valued on target_date (any time of day)"""
+        start = datetime.combine(target_date, datetime.min.time())
+        return db.and_(
+            cls.date_of_valuation >= start,
+            cls.date_of_valuation < start + timedelta(days=1)
+        )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -74,4 +107,64 @@ class Investments (db.Model):
         }
 
 
-    
\ No newline at end of file
+
+class PortfolioSnapshot(db.Model):
+    """Daily rollup of Investments per valuation date, portfolio and holding"""
+    __tablename__ = 'portfolio_snapshots'
+
+    valuation_date = db.Column(db.Date, primary_key=True)
+    portfolio = db.Column(db.String(15), primary_key=True)
+    investment = db.Column(db.String(100), primary_key=True)
+    total_units = db.Column(db.Numeric(15, 2), nullable=False, default=0)
+    total_cost = db.Column(db.Numeric(15, 2), nullable=False, default=0)
+    total_value = db.Column(db.Numeric(15, 2), nullable=False, default=0)
+    row_count = db.Column(db.Integer, nullable=False, default=0)
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_portfolio_snapshots_investment_date', 'investment', 'valuation_date'),
+    )
+
+    def to_dict(self):
+        return {
+            'valuation_date': self.valuation_date.isoformat() if self.valuation_date else None,
+            'portfolio': self.portfolio,
+            'investment': self.investment,
+            'total_units': float(self.total_units),
+            'total_cost': float(self.total_cost),
+            'total_value': float(self.total_value),
+            'row_count': self.row_count
+        }
+
+
+class PriceSymbol(db.Model):
+    """Sync state of a symbol's locally stored daily price history"""
+    __tablename__ = 'price_symbols'
+
+    symbol = db.Column(db.String(15), primary_key=True)
+    backfilled_at = db.Column(db.DateTime)
+    fetched_at = db.Column(db.DateTime)
+    last_refreshed = db.Column(db.String(30))
+    timezone = db.Column(db.String(30))
+
+
+class DailyPrice(db.Model):
+    """One daily OHLCV bar; the (symbol, date) primary key serves range scans"""
+    __tablename__ = 'daily_prices'
+
+    symbol = db.Column(db.String(15), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    open = db.Column(db.Numeric(15, 4))
+    high = db.Column(db.Numeric(15, 4))
+    low = db.Column(db.Numeric(15, 4))
+    close = db.Column(db.Numeric(15, 4))
+    volume = db.Column(db.BigInteger)
+
+
+class DataVersion(db.Model):
+    """Write counter per table, bumped in the writing transaction; drives response cache ETags"""
+    __tablename__ = 'data_versions'
+
+    table_name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    modified = db.Column(db.BigInteger, nullable=False, default=0)  # Unix seconds, increases with every write
@@ -1,38 +1,77 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
 from app import db
 from app.models.financial import FinancialStatement, KPIMetric
 from datetime import datetime
-from sqlalchemy import text
-from run_report_data import query_investment_data,populate_from_csv
+from sqlalchemy import select, text
+from run_report_data import query_investment_data
+from app.services.analytics import DEFAULT_WINDOW, portfolio_analytics
+from app.services.bulk import create_kpis, create_statements
+from app.services.dashboard import get_dashboard_summary
+from app.services.downsample import (
+    downsample_bars, downsample_columns, downsample_points, parse_downsample_args
+)
+from app.services.history import company_history_columns, company_history_json
+from app.services.ingest import ingest_csv
+from app.services.market_data import UpstreamError, get_daily_batch, get_price_store
+from app.services.pagination import (
+    KPI_FIELDS, STATEMENT_FIELDS, kpi_page, parse_page_args, statement_page,
+    statement_page_with_kpis
+)
+from app.services.report_cache import get_report_cache
+from app.services.report_jobs import ReportQueueFull, get_report_jobs
+from app.services.response_cache import cached_response
+from app.services.reports import render_report, report_cache_key, report_filename
 from flask import send_file
 import os
-from app.models.financial import Investments
+from app.models.financial import Investments, PortfolioSnapshot
+from app.json_provider import embedded_json_response, rows_response
 
 api = Blueprint('api', __name__, url_prefix='/api')
 
 # GET: Retrieve all financial statements
 @api.route('/statements', methods=['GET'])
+@cached_response('financial_statements', 'kpi_metrics')
 def get_statements():
     try:
-        statements = FinancialStatement.query.all()
-        return jsonify({
-            'success': True,
-            'data': [stmt.to_dict() for stmt in statements],
-            'count': len(statements)
-        })
+        # Keyset pagination: pass next_cursor back as ?cursor= for the next page
+        cursor, limit, fields = parse_page_args(request.args, STATEMENT_FIELDS)
+        
+        # Optional: statements whose period overlaps period_from..period_to (YYYY-MM-DD)
+        try:
+            period_from = request.args.get('period_from')
+            period_to = request.args.get('period_to')
+            period_from = datetime.strptime(period_from, '%Y-%m-%d').date() if period_from else None
+            period_to = datetime.strptime(period_to, '%Y-%m-%d').date() if period_to else None
+        except ValueError:
+            return jsonify({'success': False, 'error': 'period_from and period_to must be in YYYY-MM-DD format'}), 400
+        
+        # ?include=kpis nests each statement's metrics (optionally one metric_category)
+        include = request.args.get('include')
+        if include not in (None, 'kpis'):
+            return jsonify({'success': False, 'error': 'include must be kpis'}), 400
+        if include == 'kpis':
+            page = statement_page_with_kpis(
+                cursor, limit, fields, period_from, period_to,
+                request.args.get('metric_category')
+            )
+        else:
+            page = statement_page(cursor, limit, fields, period_from, period_to)
+        return Response(stream_with_context(page), mimetype='application/json')
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 # GET: Retrieve KPI metrics for a specific statement
 @api.route('/statements/<int:statement_id>/kpis', methods=['GET'])
+@cached_response('kpi_metrics')
 def get_kpis(statement_id):
     try:
-        kpis = KPIMetric.query.filter_by(statement_id=statement_id).all()
-        return jsonify({
-            'success': True,
-            'data': [kpi.to_dict() for kpi in kpis],
-            'count': len(kpis)
-        })
+        cursor, limit, fields = parse_page_args(request.args, KPI_FIELDS)
+        page = kpi_page(statement_id, cursor, limit, fields)
+        return Response(stream_with_context(page), mimetype='application/json')
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -89,31 +128,53 @@ def add_kpi():
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def _bulk_response(create):
+    """Run a bulk create for the JSON array in the request body"""
+    items = request.get_json(silent=True)
+    if not isinstance(items, list) or not items:
+        return jsonify({'success': False, 'error': 'Request body must be a non-empty JSON array'}), 400
+    max_rows = current_app.config['BULK_MAX_ROWS']
+    if len(items) > max_rows:
+        return jsonify({'success': False, 'error': f'At most {max_rows} items per request'}), 400
+    
+    # ?atomic=false inserts the valid items and reports the rest
+    atomic = request.args.get('atomic', 'true').lower() != 'false'
+    result = create(items, atomic)
+    
+    if not result['inserted'] and result['errors']:
+        status = 400
+    elif result['errors']:
+        status = 207
+    else:
+        status = 201
+    return jsonify({'success': not result['errors'], **result}), status
+
+# POST: Add many financial statements in one transaction
+@api.route('/statements/bulk', methods=['POST'])
+def add_statements_bulk():
+    try:
+        return _bulk_response(create_statements)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# POST: Add many KPI metrics in one transaction
+@api.route('/kpis/bulk', methods=['POST'])
+def add_kpis_bulk():
+    try:
+        return _bulk_response(create_kpis)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 # GET: Dashboard summary data
 @api.route('/dashboard', methods=['GET'])
 def dashboard_summary():
     try:
-        total_statements = FinancialStatement.query.count()
-        total_kpis = KPIMetric.query.count()
-        
-        # Get recent statements
-        recent_statements = FinancialStatement.query.order_by(
-            FinancialStatement.upload_date.desc()
-        ).limit(5).all()
-        
-        # Get profitability KPIs
-        profit_kpis = KPIMetric.query.filter_by(
-            metric_category='profitability'
-        ).limit(5).all()
+        # One combined query, reused for a few seconds across pollers
+        summary = get_dashboard_summary()
         
         return jsonify({
             'success': True,
-            'summary': {
-                'total_statements': total_statements,
-                'total_kpis': total_kpis,
-                'recent_statements': [stmt.to_dict() for stmt in recent_statements],
-                'recent_kpis': [kpi.to_dict() for kpi in profit_kpis]
-            }
+            'summary': summary
         })
         
     except Exception as e:
@@ -208,7 +269,7 @@ from flask import jsonify
 @api.route('/investment-files', methods=['GET'])
 def get_investment_files():
     try:
-        directory = r'C:\Users\AndrewKnott\Projects\Investments'
+        directory = current_app.config['INVESTMENT_FILES_DIR']
         files = []
         
         if os.path.exists(directory):
@@ -248,20 +309,22 @@ def process_investment_file():
         if not selected_date_str:
             return jsonify({'success': False, 'error': 'No date selected'}), 400
         
+        if os.path.basename(selected_file) != selected_file:
+            return jsonify({'success': False, 'error': 'Invalid file name'}), 400
+        
         # Convert string date to date object
         from datetime import datetime
         selected_date = datetime.strptime(selected_date_str, '%Y-%m-%d').date()
         print(f"Parsed date: {selected_date}")
         
         # Build full path
-        full_path = f'C:/Users/AndrewKnott/Projects/Investments/{selected_file}'
+        full_path = os.path.join(current_app.config['INVESTMENT_FILES_DIR'], selected_file)
         print(f"Full path: {full_path}")
         
-        # Import and call function
-        from populate_data import populate_from_csv
-        print("About to call populate_from_csv")
-        populate_from_csv(full_path, portfolio_name, selected_date)
-        print("populate_from_csv completed successfully")
+        # Ingest on this request's app context and session
+        print("About to call ingest_csv")
+        result = ingest_csv(full_path, portfolio_name, selected_date)
+        print("ingest_csv completed successfully")
         
         return jsonify({
             'success': True,
@@ -269,7 +332,9 @@ def process_investment_file():
             'data': {
                 'file_processed': selected_file,
                 'portfolio': portfolio_name,
-                'date_processed': selected_date_str
+                'date_processed': selected_date_str,
+                'rows_inserted': result['inserted'],
+                'rows_per_sec': round(result['rows_per_sec'], 1)
             }
         })
         
@@ -312,39 +377,81 @@ def process_investment_file():
 #         traceback.print_exc()  # This will show the full error
 #         return jsonify({'success': False, 'error': str(e)}), 500
     
+# GET: Valuation history for many (default all) companies in one columnar payload
+@api.route('/investment-history', methods=['GET'])
+@cached_response('portfolio_snapshots')
+def get_investment_history_columns():
+    try:
+        # Repeat the parameter for several companies: ?company=A&company=B
+        companies = request.args.getlist('company')
+        start = request.args.get('start')
+        end = request.args.get('end')
+        
+        # Optional: bound the payload with max_points and/or weekly/monthly resolution
+        try:
+            max_points, resolution = parse_downsample_args(request.args)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        start = datetime.strptime(start, '%Y-%m-%d').date() if start else None
+        end = datetime.strptime(end, '%Y-%m-%d').date() if end else None
+        
+        history = company_history_columns(companies, start, end)
+        dates, series = downsample_columns(history['dates'], history['series'], max_points, resolution)
+        
+        return jsonify({
+            'success': True,
+            'dates': dates,
+            'series': series,
+            'count': len(series)
+        })
+        
+    except ValueError:
+        return jsonify({'success': False, 'error': 'start and end must be in YYYY-MM-DD format'}), 400
+    except Exception as e:
+        print(f"Error in get_investment_history_columns: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @api.route('/investment-history/<string:company_name>', methods=['GET'])
+@cached_response('investments')
 def get_investment_history(company_name):
     try:
-        # Query your database for the specific company's valuations over time
-        history = db.session.query(
-            Investments.date_of_valuation,
-            Investments.value
-        ).filter(
-            Investments.investment == company_name
-        ).order_by(
-            Investments.date_of_valuation
+        # Optional: bound the payload with max_points and/or weekly/monthly resolution
+        try:
+            max_points, resolution = parse_downsample_args(request.args)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        # The full history as objects: the database writes the JSON array
+        if max_points is None and resolution in (None, 'daily') and request.args.get('format') != 'rows':
+            history_json = company_history_json(company_name)
+            if history_json is not None:
+                return embedded_json_response('data', history_json, success=True, company=company_name)
+        
+        # Query your database for the specific company's valuations over time,
+        # as (date, float) tuples the JSON provider encodes directly
+        history = db.session.execute(
+            select(
+                Investments.valuation_day(),
+                db.type_coerce(db.func.coalesce(Investments.value, 0), db.Float)
+            ).where(
+                Investments.investment == company_name
+            ).order_by(
+                Investments.date_of_valuation
+            )
         ).all()
         
-        # Format the data for the frontend
-        formatted_data = []
-        for record in history:
-            # Handle both datetime and date objects
-            if hasattr(record.date_of_valuation, 'date'):
-                # It's a datetime object
-                date_str = record.date_of_valuation.date().strftime('%Y-%m-%d')
-            else:
-                # It's already a date object
-                date_str = record.date_of_valuation.strftime('%Y-%m-%d')
-            
-            formatted_data.append({
-                'date': date_str,
-                'value': float(record.value) if record.value else 0
-            })
+        # LTTB keeps the peaks and troughs the chart would otherwise lose
+        history = downsample_points(history, max_points, resolution, date_key=0, value_key=1)
+        
+        # ?format=rows: {'columns': ['date', 'value'], 'rows': [[date, value], ...]}
+        if request.args.get('format') == 'rows':
+            return rows_response(('date', 'value'), history, success=True, company=company_name)
         
         return jsonify({
             'success': True,
             'company': company_name,
-            'data': formatted_data
+            'data': [{'date': day, 'value': value} for day, value in history]
         })
         
     except Exception as e:
@@ -352,10 +459,11 @@ def get_investment_history(company_name):
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @api.route('/companies', methods=['GET'])
+@cached_response('portfolio_snapshots')
 def get_companies():
     try:
-        # Get unique company names from your investments table
-        companies = db.session.query(Investments.investment).distinct().all()
+        # Get unique company names from the snapshot rollup
+        companies = db.session.query(PortfolioSnapshot.investment).distinct().all()
         
         # Extract company names from query result
         company_list = [company[0] for company in companies if company[0]]
@@ -372,104 +480,140 @@ def get_companies():
 @api.route('/stock-data/<string:symbol>', methods=['GET'])
 def get_stock_data(symbol):
     try:
-        # Your Alpha Vantage API key
-        api_key = "153TPL2JUDBYVGSH"  # Replace with your actual key
-        
         # Optional: Get period from query parameters (default to 100 days)
         outputsize = request.args.get('outputsize', 'compact')  # 'compact' or 'full'
         
-        # Alpha Vantage API URL
-        url = f"https://www.alphavantage.co/query"
-        params = {
-            'function': 'TIME_SERIES_DAILY',
-            'symbol': symbol,
-            'outputsize': outputsize,
-            'apikey': api_key
-        }
+        # Optional: explicit date range (YYYY-MM-DD), overrides outputsize
+        start = request.args.get('start')
+        end = request.args.get('end')
+        
+        # Optional: merge bars into weekly/monthly candles and/or at most max_points buckets
+        try:
+            max_points, resolution = parse_downsample_args(request.args)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        start = datetime.strptime(start, '%Y-%m-%d').date() if start else None
+        end = datetime.strptime(end, '%Y-%m-%d').date() if end else None
         
         print(f"Fetching stock data for: {symbol}")
         
-        # Make API request
-        response = requests.get(url, params=params)
-        data = response.json()
+        # Synced into the local price store at most once per market close,
+        # then served by a range scan
+        series, cached = get_price_store().get_daily(symbol, outputsize, start, end)
         
-        # Check for API errors
-        if "Error Message" in data:
-            return jsonify({
-                'success': False, 
-                'error': f'Invalid symbol: {symbol}'
-            }), 400
+        # Bars are newest first; bucket them oldest first
+        bars = downsample_bars(series['bars'][::-1], max_points, resolution)[::-1]
         
-        if "Note" in data:
-            return jsonify({
-                'success': False, 
-                'error': 'API rate limit exceeded. Try again in a minute.'
-            }), 429
+        return jsonify({
+            'success': True,
+            'symbol': symbol,
+            'data': bars,
+            'metadata': series['metadata'],
+            'count': len(bars),
+            'cached': cached
+        })
         
-        # Extract time series data
-        time_series_key = "Time Series (Daily)"
-        if time_series_key not in data:
-            return jsonify({
-                'success': False, 
-                'error': 'No data available for this symbol'
-            }), 404
+    except UpstreamError as e:
+        return jsonify({
+            'success': False, 
+            'error': str(e)
+        }), e.status_code
+    except ValueError:
+        return jsonify({
+            'success': False, 
+            'error': 'start and end must be in YYYY-MM-DD format'
+        }), 400
+    except Exception as e:
+        print(f"Error in get_stock_data: {e}")
+        return jsonify({
+            'success': False, 
+            'error': str(e)
+        }), 500
+    
+# POST: Daily series for a list of symbols in one response
+@api.route('/stock-data/batch', methods=['POST'])
+def get_stock_data_batch():
+    try:
+        data = request.get_json(silent=True) or {}
+        symbols = data.get('symbols')
+        outputsize = data.get('outputsize', 'compact')
         
-        time_series = data[time_series_key]
+        if not isinstance(symbols, list) or not symbols:
+            return jsonify({'success': False, 'error': 'symbols must be a non-empty list'}), 400
         
-        # Format data for frontend
-        formatted_data = []
-        for date_str, daily_data in time_series.items():
-            formatted_data.append({
-                'date': date_str,
-                'open': float(daily_data['1. open']),
-                'high': float(daily_data['2. high']),
-                'low': float(daily_data['3. low']),
-                'close': float(daily_data['4. close']),
-                'volume': int(daily_data['5. volume'])
-            })
+        # Normalise and de-duplicate, keeping the caller's order
+        symbols = list(dict.fromkeys(str(symbol).upper() for symbol in symbols))
+        max_symbols = current_app.config['STOCK_BATCH_MAX_SYMBOLS']
+        if len(symbols) > max_symbols:
+            return jsonify({'success': False, 'error': f'At most {max_symbols} symbols per request'}), 400
         
-        # Sort by date (newest first)
-        formatted_data.sort(key=lambda x: x['date'], reverse=True)
+        start = datetime.strptime(data['start'], '%Y-%m-%d').date() if data.get('start') else None
+        end = datetime.strptime(data['end'], '%Y-%m-%d').date() if data.get('end') else None
         
-        # Get metadata
-        metadata = data.get("Meta Data", {})
+        results = get_daily_batch(symbols, outputsize, start, end)
         
         return jsonify({
             'success': True,
-            'symbol': symbol,
-            'data': formatted_data,
-            'metadata': {
-                'symbol': metadata.get('2. Symbol', symbol),
-                'last_refreshed': metadata.get('3. Last Refreshed', ''),
-                'timezone': metadata.get('5. Time Zone', 'US/Eastern')
-            },
-            'count': len(formatted_data)
+            'results': results,
+            'count': len(results),
+            'failed': [symbol for symbol, result in results.items() if not result['success']]
         })
         
-    except requests.RequestException as e:
+    except ValueError:
         return jsonify({
             'success': False, 
-            'error': f'API request failed: {str(e)}'
-        }), 500
+            'error': 'start and end must be in YYYY-MM-DD format'
+        }), 400
     except Exception as e:
-        print(f"Error in get_stock_data: {e}")
+        print(f"Error in get_stock_data_batch: {e}")
         return jsonify({
             'success': False, 
             'error': str(e)
         }), 500
     
+# GET: Portfolio performance analytics over the valuation history
+@api.route('/analytics', methods=['GET'])
+@cached_response('portfolio_snapshots')
+def get_analytics():
+    try:
+        portfolio = request.args.get('portfolio')
+        start = request.args.get('start')
+        end = request.args.get('end')
+        window = request.args.get('window', DEFAULT_WINDOW, type=int)
+        
+        start = datetime.strptime(start, '%Y-%m-%d').date() if start else None
+        end = datetime.strptime(end, '%Y-%m-%d').date() if end else None
+        
+        if window < 2:
+            return jsonify({'success': False, 'error': 'window must be at least 2'}), 400
+        
+        return jsonify({
+            'success': True,
+            'portfolio': portfolio or 'all',
+            'window': window,
+            'data': portfolio_analytics(portfolio, start, end, window)
+        })
+        
+    except ValueError:
+        return jsonify({'success': False, 'error': 'start and end must be in YYYY-MM-DD format'}), 400
+    except Exception as e:
+        print(f"Error in get_analytics: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 # Add this new endpoint to your Flask API
 @api.route('/unique-dates', methods=['GET'])
+@cached_response('portfolio_snapshots')
 def get_unique_dates():
     """
     Returns unique valuation dates from the investments table
     """
     try:
-        # Query to get unique dates, ordered by date descending (most recent first)
+        # Unique dates from the snapshot rollup, most recent first
         unique_dates = db.session.query(
-            db.func.date(Investments.date_of_valuation).label('date')
+            PortfolioSnapshot.valuation_date.label('date')
         ).distinct().order_by(
-            db.func.date(Investments.date_of_valuation).desc()
+            PortfolioSnapshot.valuation_date.desc()
         ).all()
         
         # Convert to list of date strings
@@ -485,6 +629,15 @@ def get_unique_dates():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+PDF_CHUNK_SIZE = 64 * 1024
+
+def _iter_chunks(data, chunk_size=PDF_CHUNK_SIZE):
+    """Stream an in-memory payload to the client in fixed-size chunks"""
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        yield bytes(view[start:start + chunk_size])
+
+
 # Update your existing generate-pdf endpoint to accept date parameter
 @api.route('/generate-pdf', methods=['GET'])
 def generate_pdf_report():
@@ -494,32 +647,119 @@ def generate_pdf_report():
         
         print(f"Generating PDF from database data for date: {selected_date or 'all dates'}...")
         
-        # Specify full path for PDF
-        date_suffix = f"_{selected_date}" if selected_date else "_all"
-        pdf_filename = f"investment_report{date_suffix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        pdf_full_path = os.path.join(r'C:\Users\AndrewKnott\Projects\Investments', pdf_filename)
+        pdf_filename = report_filename(selected_date)
+        cache = get_report_cache()
+        cache_key = report_cache_key(selected_date)
+        pdf_path = cache.get(cache_key)
+        
+        if pdf_path is not None:
+            print(f"PDF served from cache: {pdf_path}")
+            return send_file(
+                pdf_path,
+                as_attachment=True,
+                download_name=pdf_filename,
+                mimetype='application/pdf'
+            )
+        
+        # Render in memory and stream the bytes; the cache copy is written
+        # once the response has gone out
+        pdf_bytes = render_report(selected_date)
+        response = Response(
+            _iter_chunks(pdf_bytes),
+            mimetype='application/pdf',
+            headers={
+                'Content-Disposition': f'attachment; filename={pdf_filename}',
+                'Content-Length': str(len(pdf_bytes))
+            }
+        )
+        response.call_on_close(lambda: cache.put(cache_key, pdf_bytes))
+        return response
+        
+    except Exception as e:
+        print(f"Error generating PDF: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+def _report_job_payload(job):
+    return {
+        'id': job['id'],
+        'status': job['status'],
+        'date': job['date'],
+        'error': job['error'],
+        'status_url': f"/api/reports/{job['id']}",
+        'download_url': f"/api/reports/{job['id']}/download" if job['status'] == 'finished' else None
+    }
+
+# POST: Queue a PDF report to be generated in the background
+@api.route('/reports', methods=['POST'])
+def create_report_job():
+    try:
+        data = request.get_json(silent=True) or {}
+        selected_date = data.get('date')  # Format: YYYY-MM-DD, omit for all dates
+        
+        if selected_date:
+            datetime.strptime(selected_date, '%Y-%m-%d')
         
-        from run_report_data import generate_pdf_from_sql_data
+        job = get_report_jobs().submit(selected_date)
         
-        # Pass the selected date to the PDF generation function
-        pdf_path = generate_pdf_from_sql_data(pdf_full_path, selected_date=selected_date)
+        return jsonify({
+            'success': True,
+            'job': _report_job_payload(job)
+        }), 202
         
-        print(f"PDF generated at: {pdf_path}")
+    except ReportQueueFull as e:
+        return jsonify({'success': False, 'error': str(e)}), 503, {'Retry-After': '5'}
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Date must be in YYYY-MM-DD format'}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# GET: Status of a background report job
+@api.route('/reports/<string:job_id>', methods=['GET'])
+def get_report_job(job_id):
+    try:
+        job = get_report_jobs().get(job_id)
         
-        # Check if file exists
-        if not os.path.exists(pdf_path):
-            raise FileNotFoundError(f"PDF was not created at {pdf_path}")
+        if not job:
+            return jsonify({'success': False, 'error': 'Report job not found'}), 404
+        
+        return jsonify({
+            'success': True,
+            'job': _report_job_payload(job)
+        })
+        
+    except Exception as e:
+        print(f"Error in get_report_job: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# GET: Download the PDF produced by a finished report job
+@api.route('/reports/<string:job_id>/download', methods=['GET'])
+def download_report_job(job_id):
+    try:
+        job = get_report_jobs().get(job_id)
+        
+        if not job:
+            return jsonify({'success': False, 'error': 'Report job not found'}), 404
+        
+        if job['status'] != 'finished':
+            return jsonify({
+                'success': False,
+                'error': f"Report is not ready (status: {job['status']})"
+            }), 409
+        
+        pdf_path = get_report_cache().get(job['cache_key'])
+        if pdf_path is None:
+            return jsonify({'success': False, 'error': 'Report has expired, please generate it again'}), 410
         
         return send_file(
             pdf_path,
             as_attachment=True,
-            download_name=pdf_filename,
+            download_name=report_filename(job['date'], datetime.fromtimestamp(job['created_at'])),
             mimetype='application/pdf'
         )
         
     except Exception as e:
-        print(f"Error generating PDF: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        print(f"Error in download_report_job: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
-
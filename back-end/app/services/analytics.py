@@ -0,0 +1,239 @@
+import numpy as np
+from sqlalchemy import select
+from app import db
+from app.models.financial import PortfolioSnapshot
+
+DEFAULT_WINDOW = 12
+
+
+def load_valuation_matrix(portfolio=None, start=None, end=None):
+    """
+    Load value, cost and external cash flow history as dense (date x holding) arrays
+
+    Reads the daily snapshot rollup in a single query and scatters it into
+    contiguous float64 matrices, one column per portfolio and holding.
+    Portfolios may be valued on different days, so on a date its portfolio
+    was not valued a holding carries its last valuation forward; a holding
+    missing from its portfolio's valuation has been sold. Flows are taken
+    per position (see position_flows) and every matrix is then summed per
+    holding across portfolios.
+
+    Returns:
+        tuple: (dates, holdings, values, costs, flows); flows has one row
+        fewer than the others, for the periods between dates
+    """
+    # Core select with float columns: no ORM row objects or Decimal conversion
+    query = select(
+        PortfolioSnapshot.valuation_date,
+        PortfolioSnapshot.portfolio,
+        PortfolioSnapshot.investment,
+        db.type_coerce(PortfolioSnapshot.total_value, db.Float),
+        db.type_coerce(PortfolioSnapshot.total_cost, db.Float),
+        db.type_coerce(PortfolioSnapshot.total_units, db.Float)
+    )
+    if portfolio:
+        query = query.where(PortfolioSnapshot.portfolio == portfolio)
+    if start:
+        query = query.where(PortfolioSnapshot.valuation_date >= start)
+    if end:
+        query = query.where(PortfolioSnapshot.valuation_date <= end)
+    rows = db.session.connection().execute(query).all()
+
+    if not rows:
+        return [], [], np.zeros((0, 0)), np.zeros((0, 0)), np.zeros((0, 0))
+
+    row_dates, row_portfolios, row_holdings, row_values, row_costs, row_units = zip(*rows)
+    dates = sorted(set(row_dates))
+    portfolios = sorted(set(row_portfolios))
+    positions = sorted(set(zip(row_portfolios, row_holdings)))
+    holdings = sorted(set(row_holdings))
+    date_lookup = {d: i for i, d in enumerate(dates)}
+    portfolio_lookup = {p: i for i, p in enumerate(portfolios)}
+    position_lookup = {p: i for i, p in enumerate(positions)}
+    holding_lookup = {h: i for i, h in enumerate(holdings)}
+    count = len(rows)
+    date_index = np.fromiter(map(date_lookup.__getitem__, row_dates), dtype=np.intp, count=count)
+    portfolio_index = np.fromiter(map(portfolio_lookup.__getitem__, row_portfolios), dtype=np.intp, count=count)
+    position_index = np.fromiter(
+        map(position_lookup.__getitem__, zip(row_portfolios, row_holdings)), dtype=np.intp, count=count
+    )
+
+    shape = (len(dates), len(positions))
+    values = np.zeros(shape)
+    costs = np.zeros(shape)
+    units = np.zeros(shape)
+    held = np.zeros(shape, dtype=bool)
+    values[date_index, position_index] = np.fromiter(row_values, dtype=float, count=count)
+    costs[date_index, position_index] = np.fromiter(row_costs, dtype=float, count=count)
+    units[date_index, position_index] = np.fromiter(row_units, dtype=float, count=count)
+    held[date_index, position_index] = True
+
+    # Dates each position's portfolio was valued on; elsewhere take the last valuation
+    portfolio_valued = np.zeros((len(dates), len(portfolios)), dtype=bool)
+    portfolio_valued[date_index, portfolio_index] = True
+    position_portfolio = np.array([portfolio_lookup[p] for p, _ in positions], dtype=np.intp)
+    valued = portfolio_valued[:, position_portfolio]
+    last_valued = np.maximum.accumulate(
+        np.where(valued, np.arange(len(dates))[:, None], 0), axis=0
+    )
+    columns = np.arange(len(positions))
+    values, costs, units, held = (
+        matrix[last_valued, columns] for matrix in (values, costs, units, held)
+    )
+
+    flows = position_flows(values, costs, units, held)
+
+    # Sum positions per holding across portfolios
+    position_holding = np.array([holding_lookup[h] for _, h in positions], dtype=np.intp)
+
+    def by_holding(matrix):
+        summed = np.zeros((len(matrix), len(holdings)))
+        np.add.at(summed, (slice(None), position_holding), matrix)
+        return summed
+
+    return dates, holdings, by_holding(values), by_holding(costs), by_holding(flows)
+
+
+def position_flows(values, costs, units, held):
+    """
+    External cash flow into each position over each period, at market value
+
+    A position opened during a period is paid in at its closing value and
+    one closed is paid out at its last value, so neither shows a gain from
+    a cost basis set long before. A partial sale pays out the units sold
+    at the closing price; a purchase, or a position without units, uses
+    the change in cost basis.
+
+    Args:
+        values, costs, units: (D x P) float arrays per position
+        held: (D x P) bool array, True where the position is held
+
+    Returns:
+        ndarray: (D-1 x P) flows
+    """
+    opened = held[1:] & ~held[:-1]
+    closed = held[:-1] & ~held[1:]
+    sold_units = np.diff(units, axis=0)
+    sold = held[1:] & held[:-1] & (sold_units < 0) & (units[1:] > 0)
+    closing_price = np.divide(values[1:], units[1:], out=np.zeros_like(values[1:]), where=units[1:] > 0)
+
+    flows = np.diff(costs, axis=0)
+    flows = np.where(sold, sold_units * closing_price, flows)
+    flows = np.where(opened, values[1:], flows)
+    return np.where(closed, -values[:-1], flows)
+
+
+def periods_per_year(dates):
+    """Annualisation factor from the median spacing of valuation dates"""
+    if len(dates) < 2:
+        return 1.0
+    ordinals = np.array([d.toordinal() for d in dates])
+    spacing = np.median(np.diff(ordinals))
+    return 365.25 / spacing if spacing > 0 else 1.0
+
+
+def compute_metrics(dates, holdings, values, costs, window=DEFAULT_WINDOW, flows=None):
+    """
+    Time-weighted return, rolling volatility, drawdown and contributions
+
+    Period returns use the Modified Dietz method with the external cash
+    flows from load_valuation_matrix, so money paid in or taken out is not
+    counted as performance. Every metric is computed over whole arrays;
+    returns, volatility, drawdown and contributions are reported in percent.
+
+    Args:
+        dates: Sorted valuation dates (length D)
+        holdings: Holding names (length H)
+        values, costs: (D x H) float arrays
+        window: Periods in the rolling volatility window
+        flows: (D-1 x H) external cash flows; defaults to the change in cost basis
+
+    Returns:
+        dict: JSON-ready series and summary figures
+    """
+    if len(dates) == 0:
+        return {
+            'dates': [],
+            'portfolio_value': [],
+            'period_returns': [],
+            'cumulative_return': [],
+            'rolling_volatility': [],
+            'summary': None,
+            'contributions': []
+        }
+
+    total_value = values.sum(axis=1)
+    total_cost = costs.sum(axis=1)
+
+    # Per-period gains net of flows, per holding and in total
+    if flows is None:
+        flows = np.diff(costs, axis=0)
+    holding_gain = np.diff(values, axis=0) - flows
+    denominator = total_value[:-1] + 0.5 * flows.sum(axis=1)
+    valid = denominator > 0
+    safe_denominator = np.where(valid, denominator, 1.0)
+
+    holding_contribution = np.where(valid[:, None], holding_gain / safe_denominator[:, None], 0.0)
+    period_returns = holding_contribution.sum(axis=1)
+
+    growth = np.concatenate(([1.0], np.cumprod(1.0 + period_returns)))
+    cumulative_return = growth - 1.0
+    twr = growth[-1] - 1.0
+
+    annualisation = periods_per_year(dates)
+    years = len(period_returns) / annualisation if annualisation else 0
+    annualised_return = growth[-1] ** (1 / years) - 1 if years > 0 and growth[-1] > 0 else None
+
+    # Rolling volatility of period returns, annualised
+    rolling_volatility = np.full(len(dates), np.nan)
+    if len(period_returns) >= window > 1:
+        windows = np.lib.stride_tricks.sliding_window_view(period_returns, window)
+        rolling_volatility[window:] = windows.std(axis=1, ddof=1) * np.sqrt(annualisation)
+    volatility = (period_returns.std(ddof=1) * np.sqrt(annualisation)
+                  if len(period_returns) > 1 else None)
+
+    # Max drawdown of the time-weighted growth index
+    running_peak = np.maximum.accumulate(growth)
+    drawdown = growth / running_peak - 1.0
+    trough = int(np.argmin(drawdown))
+    peak = int(np.argmax(growth[:trough + 1]))
+
+    contribution_totals = holding_contribution.sum(axis=0)
+    gain_totals = holding_gain.sum(axis=0)
+    order = np.argsort(-contribution_totals)
+
+    return {
+        'dates': [d.isoformat() for d in dates],
+        'portfolio_value': total_value.tolist(),
+        'period_returns': [None] + (period_returns * 100).tolist(),
+        'cumulative_return': (cumulative_return * 100).tolist(),
+        'rolling_volatility': [None if np.isnan(v) else float(v) * 100 for v in rolling_volatility],
+        'summary': {
+            'start_date': dates[0].isoformat(),
+            'end_date': dates[-1].isoformat(),
+            'periods': len(period_returns),
+            'periods_per_year': float(annualisation),
+            'time_weighted_return': float(twr) * 100,
+            'annualised_return': float(annualised_return) * 100 if annualised_return is not None else None,
+            'volatility': float(volatility) * 100 if volatility is not None else None,
+            'max_drawdown': float(drawdown[trough]) * 100,
+            'max_drawdown_peak': dates[peak].isoformat(),
+            'max_drawdown_trough': dates[trough].isoformat(),
+            'total_value': float(total_value[-1]),
+            'total_cost': float(total_cost[-1])
+        },
+        'contributions': [
+            {
+                'investment': holdings[i],
+                'contribution': float(contribution_totals[i]) * 100,
+                'gain': float(gain_totals[i])
+            }
+            for i in order
+        ]
+    }
+
+
+def portfolio_analytics(portfolio=None, start=None, end=None, window=DEFAULT_WINDOW):
+    """Load the valuation history and compute its metrics"""
+    dates, holdings, values, costs, flows = load_valuation_matrix(portfolio, start, end)
+    return compute_metrics(dates, holdings, values, costs, window, flows)
@@ -0,0 +1,186 @@
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import insert, select
+from app import db
+from app.models.financial import FinancialStatement, KPIMetric
+
+
+def _parse_date(value, field):
+    if value in (None, ''):
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValueError(f'{field} must be in YYYY-MM-DD format')
+
+
+def _required_string(item, field, max_length):
+    value = item.get(field)
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f'{field} is required')
+    return _optional_string(item, field, max_length)
+
+
+def _optional_string(item, field, max_length):
+    value = item.get(field)
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f'{field} must be a string')
+    if len(value) > max_length:
+        raise ValueError(f'{field} must be at most {max_length} characters')
+    return value
+
+
+def validate_statement(item):
+    """
+    Column values for one statement object, as add_statement reads them
+
+    Raises:
+        ValueError: Describing the first invalid field
+    """
+    if not isinstance(item, dict):
+        raise ValueError('Each item must be a JSON object')
+    return {
+        'file_name': _required_string(item, 'file_name', 255),
+        'company_name': _optional_string(item, 'company_name', 255),
+        'period_start': _parse_date(item.get('period_start'), 'period_start'),
+        'period_end': _parse_date(item.get('period_end'), 'period_end'),
+        'statement_type': _optional_string(item, 'statement_type', 50)
+    }
+
+
+def validate_kpi(item):
+    """
+    Column values for one KPI object, as add_kpi reads them
+
+    Raises:
+        ValueError: Describing the first invalid field
+    """
+    if not isinstance(item, dict):
+        raise ValueError('Each item must be a JSON object')
+    statement_id = item.get('statement_id')
+    if isinstance(statement_id, str) and statement_id.strip().isdigit():
+        statement_id = int(statement_id)
+    if isinstance(statement_id, bool) or not isinstance(statement_id, int):
+        raise ValueError('statement_id must be an integer')
+
+    metric_value = item.get('metric_value')
+    if metric_value is not None:
+        try:
+            metric_value = Decimal(str(metric_value))
+        except InvalidOperation:
+            raise ValueError('metric_value must be a number')
+        if not metric_value.is_finite() or abs(metric_value) >= Decimal('1e13'):
+            raise ValueError('metric_value is out of range')
+
+    return {
+        'statement_id': statement_id,
+        'metric_name': _required_string(item, 'metric_name', 100),
+        'metric_value': metric_value,
+        'metric_category': _optional_string(item, 'metric_category', 50)
+    }
+
+
+def validate_batch(items, validate):
+    """
+    Validate every item before anything is written
+
+    Returns:
+        tuple: (rows as (index, values) pairs, errors as {'index', 'error'} dicts)
+    """
+    rows = []
+    errors = []
+    for index, item in enumerate(items):
+        try:
+            rows.append((index, validate(item)))
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+    return rows, errors
+
+
+def check_statement_ids(rows, errors):
+    """
+    Move KPI rows that reference missing statements into errors
+
+    One IN query covers the whole batch instead of a lookup per row.
+    """
+    wanted = {values['statement_id'] for _, values in rows}
+    existing = set(db.session.scalars(
+        select(FinancialStatement.id).where(FinancialStatement.id.in_(wanted))
+    )) if wanted else set()
+
+    kept = []
+    for index, values in rows:
+        if values['statement_id'] in existing:
+            kept.append((index, values))
+        else:
+            errors.append({'index': index, 'error': f"Statement {values['statement_id']} does not exist"})
+    errors.sort(key=lambda error: error['index'])
+    return kept
+
+
+def bulk_insert(model, rows):
+    """
+    Insert validated rows with one executemany INSERT ... RETURNING id
+
+    The caller owns the transaction.
+
+    Returns:
+        list: Generated ids, in the same order as rows
+    """
+    if not rows:
+        return []
+    table = model.__table__
+    result = db.session.execute(
+        insert(table).returning(table.c.id, sort_by_parameter_order=True),
+        [values for _, values in rows]
+    )
+    return list(result.scalars())
+
+
+def bulk_create(model, items, validate, atomic=True, check=None):
+    """
+    Validate and insert a batch of rows in one transaction
+
+    With atomic=True any invalid item rejects the whole batch; otherwise
+    the valid items are inserted and the invalid ones reported.
+
+    Args:
+        model: FinancialStatement or KPIMetric
+        items: Decoded JSON array
+        validate: Per-item validator returning column values
+        atomic: Reject everything if any item is invalid
+        check: Optional batch-level check, as check_statement_ids
+
+    Returns:
+        dict: 'ids' aligned with the input (None where rejected), 'inserted'
+        count and per-index 'errors'
+    """
+    rows, errors = validate_batch(items, validate)
+    if check is not None:
+        rows = check(rows, errors)
+
+    ids = [None] * len(items)
+    if errors and atomic:
+        return {'ids': ids, 'inserted': 0, 'errors': errors}
+
+    try:
+        for (index, _), new_id in zip(rows, bulk_insert(model, rows)):
+            ids[index] = new_id
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return {'ids': ids, 'inserted': len(rows), 'errors': errors}
+
+
+def create_statements(items, atomic=True):
+    """Bulk-create financial statements"""
+    return bulk_create(FinancialStatement, items, validate_statement, atomic)
+
+
+def create_kpis(items, atomic=True):
+    """Bulk-create KPI metrics, checking their statements exist in one query"""
+    return bulk_create(KPIMetric, items, validate_kpi, atomic, check_statement_ids)
@@ -0,0 +1,20 @@
+from contextlib import contextmanager
+from flask import current_app, has_app_context
+
+
+@contextmanager
+def ensure_app_context(config_name=None):
+    """
+    Run inside the caller's app context when there is one
+
+    Request handlers already have an app, engine and connection pool, so they
+    are reused as-is. Only CLI entry points fall through to create_app().
+    """
+    if has_app_context():
+        yield current_app._get_current_object()
+        return
+
+    from app import create_app
+    app = create_app(config_name)
+    with app.app_context():
+        yield app
@@ -0,0 +1,96 @@
+import threading
+import time
+from flask import current_app
+from sqlalchemy import cast, literal, null, select, true, union_all
+from app import db
+from app.models.financial import FinancialStatement, KPIMetric
+from app.services.pagination import KPI_FIELDS, STATEMENT_FIELDS, serialize_value
+from app.services.response_cache import get_response_cache
+
+RECENT_LIMIT = 5
+SUMMARY_TABLES = ('financial_statements', 'kpi_metrics')
+
+_summary_lock = threading.Lock()
+
+
+# Statement and KPI columns side by side, so both row kinds share one result
+UNION_COLUMNS = [(f's_{name}', column) for name, column in STATEMENT_FIELDS.items()]
+UNION_COLUMNS += [(f'k_{name}', column) for name, column in KPI_FIELDS.items()]
+
+
+def _union_arm(kind, source, prefix):
+    """One arm of the union: its own columns from source, typed NULLs for the other's"""
+    return select(literal(kind).label('kind'), *(
+        (source.c[column.key] if name.startswith(prefix) else cast(null(), column.type)).label(name)
+        for name, column in UNION_COLUMNS
+    ))
+
+
+def load_dashboard_summary():
+    """
+    Counts, recent statements and profitability KPIs in one round trip
+
+    The two counts are scalar subqueries on a single-row select, which is
+    outer-joined to a UNION ALL of the five most recent statements and the
+    first five profitability KPIs, so an empty database still yields the
+    counts.
+
+    Returns:
+        dict: The summary in the shape /api/dashboard has always returned
+    """
+    recent = select(FinancialStatement).order_by(
+        FinancialStatement.upload_date.desc()
+    ).limit(RECENT_LIMIT).subquery()
+    profit = select(KPIMetric).where(
+        KPIMetric.metric_category == 'profitability'
+    ).order_by(KPIMetric.id).limit(RECENT_LIMIT).subquery()
+    items = union_all(_union_arm('statement', recent, 's_'), _union_arm('kpi', profit, 'k_')).subquery()
+
+    counts = select(
+        select(db.func.count()).select_from(FinancialStatement).scalar_subquery().label('total_statements'),
+        select(db.func.count()).select_from(KPIMetric).scalar_subquery().label('total_kpis')
+    ).subquery()
+
+    rows = db.session.execute(
+        select(counts, items).select_from(counts.outerjoin(items, true()))
+    ).mappings().all()
+
+    recent_statements = [
+        {name: serialize_value(row[f's_{name}']) for name in STATEMENT_FIELDS}
+        for row in rows if row['kind'] == 'statement'
+    ]
+    recent_kpis = [
+        {name: serialize_value(row[f'k_{name}']) for name in KPI_FIELDS}
+        for row in rows if row['kind'] == 'kpi'
+    ]
+    # UNION ALL does not preserve the arms' ORDER BY
+    recent_statements.sort(key=lambda s: (s['upload_date'] or '', s['id']), reverse=True)
+    recent_kpis.sort(key=lambda k: k['id'])
+
+    return {
+        'total_statements': rows[0]['total_statements'],
+        'total_kpis': rows[0]['total_kpis'],
+        'recent_statements': recent_statements,
+        'recent_kpis': recent_kpis
+    }
+
+
+def get_dashboard_summary():
+    """
+    Dashboard summary, recomputed at most once per DASHBOARD_CACHE_TTL
+
+    A cached summary is also dropped as soon as any worker commits a write
+    to statements or KPIs, as seen in data_versions, so changes show up on
+    the next poll. Concurrent misses wait for a single recomputation
+    instead of each running the query.
+    """
+    versions = get_response_cache().versions(SUMMARY_TABLES)
+    with _summary_lock:
+        cached = current_app.extensions.get('dashboard_summary')
+        if cached is not None and cached[0] > time.monotonic() and cached[1] == versions:
+            return cached[2]
+
+        summary = load_dashboard_summary()
+        ttl = current_app.config['DASHBOARD_CACHE_TTL']
+        current_app.extensions['dashboard_summary'] = (time.monotonic() + ttl, versions, summary)
+        return summary
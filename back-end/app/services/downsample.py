@@ -0,0 +1,187 @@
+import numpy as np
+
+RESOLUTIONS = ('daily', 'weekly', 'monthly')
+MIN_POINTS = 3
+
+
+def parse_downsample_args(args):
+    """
+    Read the optional max_points / resolution query parameters
+
+    Returns:
+        tuple: (max_points or None, resolution or None)
+
+    Raises:
+        ValueError: If either parameter is out of range
+    """
+    max_points = args.get('max_points', type=int)
+    resolution = args.get('resolution')
+    if max_points is not None and max_points < MIN_POINTS:
+        raise ValueError(f'max_points must be at least {MIN_POINTS}')
+    if resolution is not None and resolution not in RESOLUTIONS:
+        raise ValueError(f"resolution must be one of {', '.join(RESOLUTIONS)}")
+    return max_points, resolution
+
+
+def _day_numbers(dates):
+    """ISO date strings (or dates) as integer days since the epoch"""
+    return np.array(dates, dtype='datetime64[D]').astype(np.int64)
+
+
+def period_starts(days, resolution):
+    """
+    Index of the first point in each weekly or monthly period
+
+    Args:
+        days: Ascending integer day numbers
+        resolution: 'weekly' (ISO weeks, Monday start) or 'monthly'
+    """
+    if resolution == 'weekly':
+        # 1970-01-01 was a Thursday, so shifting by three aligns weeks on Monday
+        keys = (days + 3) // 7
+    else:
+        keys = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    return np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets point selection
+
+    Keeps the first and last points and, from each of the threshold - 2
+    buckets in between, the point forming the largest triangle with the
+    previously kept point and the mean of the next bucket. Only the walk
+    over buckets is a Python loop; each bucket is scored as one array op.
+
+    Returns:
+        np.ndarray: Ascending indices of the kept points
+    """
+    n = len(x)
+    if threshold >= n or threshold < MIN_POINTS:
+        return np.arange(n)
+
+    # Bucket edges over the interior points 1 .. n-2
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.intp)
+    next_edges = np.append(edges[2:], n)
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        mean_x = x[end:next_edges[i]].mean()
+        mean_y = y[end:next_edges[i]].mean()
+        area = np.abs(
+            (x[previous] - mean_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (mean_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def downsample_points(points, max_points=None, resolution=None, date_key='date', value_key='value'):
+    """
+    Downsample an ascending line series of {'date', 'value'} dicts
+
+    Weekly/monthly resolution keeps the last valuation in each period;
+    max_points then applies LTTB so peaks and troughs survive. Query rows
+    work too, with date_key=0 and value_key=1.
+    """
+    if not points or (max_points is None and resolution in (None, 'daily')):
+        return points
+
+    days = _day_numbers([p[date_key] for p in points])
+    keep = np.arange(len(points))
+    if resolution in ('weekly', 'monthly'):
+        keep = np.append(period_starts(days, resolution)[1:] - 1, len(points) - 1)
+    if max_points is not None:
+        values = np.fromiter((points[i][value_key] for i in keep), dtype=float, count=len(keep))
+        keep = keep[lttb_indices(days[keep].astype(float), values, max_points)]
+    return [points[i] for i in keep]
+
+
+def _aggregate_bars(days, opens, highs, lows, closes, volumes, starts):
+    """OHLC bars merged over the groups beginning at each start index"""
+    ends = np.append(starts[1:], len(days)) - 1
+    return (
+        days[starts],
+        opens[starts],
+        np.maximum.reduceat(highs, starts),
+        np.minimum.reduceat(lows, starts),
+        closes[ends],
+        np.add.reduceat(volumes, starts)
+    )
+
+
+def downsample_bars(bars, max_points=None, resolution=None):
+    """
+    Downsample an ascending list of daily OHLC bar dicts
+
+    Bars are merged into weekly or monthly candles first, then into at most
+    max_points equal-width buckets: open of the first bar, highest high,
+    lowest low, close of the last bar and summed volume. Each merged bar
+    is dated by its first trading day.
+    """
+    if not bars or (max_points is None and resolution in (None, 'daily')):
+        return bars
+
+    columns = (
+        _day_numbers([b['date'] for b in bars]),
+        np.array([b['open'] for b in bars], dtype=float),
+        np.array([b['high'] for b in bars], dtype=float),
+        np.array([b['low'] for b in bars], dtype=float),
+        np.array([b['close'] for b in bars], dtype=float),
+        np.array([b['volume'] for b in bars], dtype=np.int64)
+    )
+    if resolution in ('weekly', 'monthly'):
+        columns = _aggregate_bars(*columns, period_starts(columns[0], resolution))
+    if max_points is not None and len(columns[0]) > max_points:
+        starts = np.unique(np.linspace(0, len(columns[0]), max_points, endpoint=False).astype(np.intp))
+        columns = _aggregate_bars(*columns, starts)
+
+    days, opens, highs, lows, closes, volumes = columns
+    return [
+        {
+            'date': str(day),
+            'open': o,
+            'high': h,
+            'low': l,
+            'close': c,
+            'volume': v
+        }
+        for day, o, h, l, c, v in zip(
+            days.astype('datetime64[D]'), opens.tolist(), highs.tolist(),
+            lows.tolist(), closes.tolist(), volumes.tolist()
+        )
+    ]
+
+
+def downsample_columns(dates, series, max_points=None, resolution=None):
+    """
+    Downsample a columnar history while keeping one shared date axis
+
+    Weekly/monthly resolution keeps the last date of each period. LTTB
+    picks the kept dates from the total across all series, so every
+    company is sampled on the same dates and totals keep their shape.
+
+    Returns:
+        tuple: (dates, series)
+    """
+    if not dates or (max_points is None and resolution in (None, 'daily')):
+        return dates, series
+
+    days = _day_numbers(dates)
+    keep = np.arange(len(dates))
+    if resolution in ('weekly', 'monthly'):
+        keep = np.append(period_starts(days, resolution)[1:] - 1, len(dates) - 1)
+    if max_points is not None and series:
+        matrix = np.array(list(series.values()), dtype=float)[:, keep]
+        totals = np.nansum(matrix, axis=0)
+        keep = keep[lttb_indices(days[keep].astype(float), totals, max_points)]
+
+    return (
+        [dates[i] for i in keep],
+        {company: [values[i] for i in keep] for company, values in series.items()}
+    )
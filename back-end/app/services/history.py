@@ -0,0 +1,95 @@
+from sqlalchemy import select
+from app import db
+from app.models.financial import Investments, PortfolioSnapshot
+
+# First SQLite release accepting ORDER BY inside an aggregate
+SQLITE_AGGREGATE_ORDER_BY = (3, 44)
+
+
+def company_history_json(company_name):
+    """
+    Valuation history of one company as ready-encoded JSON
+
+    The database builds the [{"date": ..., "value": ...}, ...] array text
+    itself (json_agg on PostgreSQL, json_group_array on SQLite 3.44+),
+    ordered inside the aggregate, so no row is fetched or converted in
+    Python. For the full history only; the downsampling paths need the rows.
+
+    Returns:
+        str: JSON array text, ordered by valuation time, or None when the
+        database cannot order an aggregate (older SQLite); callers then
+        encode the rows themselves
+    """
+    dialect = db.session.get_bind().dialect
+    day = Investments.valuation_day()
+    value = db.func.coalesce(Investments.value, 0)
+
+    if dialect.name == 'postgresql':
+        records = db.func.json_agg(db.func.json_build_object('date', day, 'value', value))
+    elif dialect.name == 'sqlite' and dialect.server_version_info >= SQLITE_AGGREGATE_ORDER_BY:
+        records = db.func.json_group_array(db.func.json_object('date', day, 'value', value))
+    else:
+        return None
+
+    query = select(
+        db.cast(records.aggregate_order_by(Investments.date_of_valuation), db.Text)
+    ).where(
+        Investments.investment == company_name
+    )
+
+    # json_agg over no rows is NULL
+    return db.session.execute(query).scalar() or '[]'
+
+
+def company_history_columns(companies=None, start=None, end=None):
+    """
+    Valuation history for many companies as one columnar payload
+
+    Runs a single query over the snapshot rollup, ordered by date, and
+    pivots it into a shared date axis with one value array per company.
+    Values are summed across portfolios; a company with no valuation on a
+    date gets None at that position.
+
+    Args:
+        companies: Investment names to include (all when empty)
+        start, end: Optional date bounds (inclusive)
+
+    Returns:
+        dict: {'dates': [...], 'series': {company: [...]}}
+    """
+    query = select(
+        PortfolioSnapshot.valuation_date,
+        PortfolioSnapshot.investment,
+        db.type_coerce(db.func.sum(PortfolioSnapshot.total_value), db.Float)
+    )
+    if companies:
+        query = query.where(PortfolioSnapshot.investment.in_(companies))
+    if start:
+        query = query.where(PortfolioSnapshot.valuation_date >= start)
+    if end:
+        query = query.where(PortfolioSnapshot.valuation_date <= end)
+    query = query.group_by(
+        PortfolioSnapshot.valuation_date, PortfolioSnapshot.investment
+    ).order_by(
+        PortfolioSnapshot.valuation_date
+    )
+
+    dates = []
+    series = {}
+    for valuation_date, company, value in db.session.connection().execute(query):
+        if not dates or dates[-1] != valuation_date:
+            dates.append(valuation_date)
+        column = series.get(company)
+        if column is None:
+            column = series[company] = []
+        # Pad dates this company was missing from, then record today's value
+        column.extend([None] * (len(dates) - 1 - len(column)))
+        column.append(float(value or 0))
+
+    for column in series.values():
+        column.extend([None] * (len(dates) - len(column)))
+
+    return {
+        'dates': [d.isoformat() for d in dates],
+        'series': dict(sorted(series.items()))
+    }
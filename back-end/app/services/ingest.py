@@ -0,0 +1,169 @@
+import csv
+import io
+import time
+from datetime import datetime
+from itertools import islice
+from sqlalchemy import insert
+from app import db
+from app.models.financial import Investments
+from app.services.response_cache import mark_tables_changed
+from app.services.snapshots import refresh_snapshots
+
+# Broker exports start with a block of account information before the CSV header
+HEADER_ROWS = 10
+DEFAULT_BATCH_SIZE = 1000
+
+INVESTMENT_COLUMNS = (
+    'portfolio', 'investment', 'tracker_id', 'units', 'cost', 'value', 'date_of_valuation'
+)
+
+
+def clean_numeric(value):
+    """Clean numeric values - remove commas, blank cells become None"""
+    if value and value.strip():
+        return float(value.replace(',', ''))
+    return None
+
+
+def parse_valuation_date(selected_date):
+    """Normalise the selected date (date, datetime or string) to a datetime"""
+    if isinstance(selected_date, str):
+        try:
+            # Assuming the frontend sends YYYY-MM-DD format
+            selected_date = datetime.strptime(selected_date, '%Y-%m-%d').date()
+        except ValueError:
+            # Try ISO format if the above fails
+            selected_date = datetime.fromisoformat(selected_date.replace('Z', '+00:00')).date()
+
+    if isinstance(selected_date, datetime):
+        return selected_date
+    return datetime.combine(selected_date, datetime.min.time())
+
+
+def iter_investment_rows(file, portfolio_name, date_of_valuation):
+    """
+    Yield one insert-ready dict per holding in a broker CSV export
+
+    Args:
+        file: Open text file positioned at the start of the export
+        portfolio_name: Portfolio the holdings belong to
+        date_of_valuation: Valuation datetime stamped on every row
+    """
+    # Skip the first 10 rows (header information)
+    for _ in range(HEADER_ROWS):
+        if next(file, None) is None:
+            return
+
+    for row in csv.DictReader(file):
+        # Skip empty rows or totals/footer rows
+        if not row['Stock'] or row['Stock'] == 'Totals' or not row['Code']:
+            continue
+
+        yield {
+            'portfolio': portfolio_name,
+            'investment': row['Stock'],
+            'tracker_id': row['Code'],
+            'units': clean_numeric(row['Units held']),
+            'cost': clean_numeric(row['Cost (£)']),
+            'value': clean_numeric(row['Value (£)']),
+            'date_of_valuation': date_of_valuation
+        }
+
+
+def iter_batches(rows, batch_size):
+    """Group an iterable of rows into lists of at most batch_size"""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _copy_batch(connection, batch):
+    """Load a batch with PostgreSQL COPY on the session's own connection"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in batch:
+        writer.writerow(['' if row[col] is None else row[col] for col in INVESTMENT_COLUMNS])
+
+    sql = f"COPY {Investments.__tablename__} ({', '.join(INVESTMENT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        if hasattr(cursor, 'copy_expert'):
+            # psycopg2
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+        else:
+            # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
+
+def _insert_batch(connection, batch):
+    """Load a batch with a single Core executemany INSERT"""
+    connection.execute(insert(Investments.__table__), batch)
+
+
+def bulk_insert_investments(rows, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Write investment rows in bounded batches without building ORM objects
+
+    Uses COPY on PostgreSQL and an executemany INSERT everywhere else. The
+    caller owns the transaction and is responsible for committing.
+
+    Returns:
+        int: Number of rows written
+    """
+    connection = db.session.connection()
+    mark_tables_changed(Investments.__tablename__)
+    write_batch = _copy_batch if connection.dialect.name == 'postgresql' else _insert_batch
+
+    inserted = 0
+    for batch in iter_batches(rows, batch_size):
+        write_batch(connection, batch)
+        inserted += len(batch)
+    return inserted
+
+
+def ingest_csv(full_path, portfolio_name, selected_date, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Stream a broker CSV export into the investments table
+
+    Runs on the current app's session, so it must be called inside an app
+    context (a request, or ensure_app_context() for scripts). The rows and
+    the matching portfolio snapshot rollup are committed as one transaction
+    and rolled back if anything fails.
+
+    Args:
+        full_path: Path to the CSV export
+        portfolio_name: Portfolio the holdings belong to
+        selected_date: Valuation date (date, datetime or YYYY-MM-DD string)
+        batch_size: Maximum rows sent to the database per statement
+
+    Returns:
+        dict: Rows inserted, elapsed seconds and rows/sec throughput
+    """
+    date_of_valuation = parse_valuation_date(selected_date)
+    started = time.perf_counter()
+
+    try:
+        with open(full_path, 'r') as file:
+            rows = iter_investment_rows(file, portfolio_name, date_of_valuation)
+            inserted = bulk_insert_investments(rows, batch_size)
+        refresh_snapshots(date_of_valuation.date(), portfolio_name)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    elapsed = time.perf_counter() - started
+    rows_per_sec = inserted / elapsed if elapsed > 0 else 0.0
+
+    return {
+        'inserted': inserted,
+        'seconds': elapsed,
+        'rows_per_sec': rows_per_sec
+    }
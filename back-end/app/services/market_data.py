@@ -0,0 +1,403 @@
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+import requests
+from requests.adapters import HTTPAdapter
+from flask import current_app
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app import db
+from app.models.financial import DailyPrice, PriceSymbol
+
+try:
+    from zoneinfo import ZoneInfo
+    MARKET_TZ = ZoneInfo('America/New_York')
+except Exception:
+    # No tz database available (e.g. Windows without tzdata) - assume EST
+    MARKET_TZ = timezone(timedelta(hours=-5))
+
+MARKET_CLOSE = (16, 0)
+COMPACT_DAYS = 100
+# Calendar span safely covered by a compact fetch (100 trading days)
+COMPACT_COVERAGE = timedelta(days=130)
+OUTPUT_SIZES = ('compact', 'full')
+SYMBOL_PATTERN = re.compile(r'[A-Z0-9.\-^]{1,15}')
+
+
+class UpstreamError(Exception):
+    """Alpha Vantage refused or could not answer a request"""
+
+    def __init__(self, message, status_code=502):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def last_market_close(now, settle_minutes=0):
+    """
+    Most recent weekday 16:00 New York close (plus settle time) before now
+
+    Exchange holidays are not modelled, which only ever costs an extra
+    upstream fetch.
+    """
+    local = now.astimezone(MARKET_TZ)
+    close = local.replace(hour=MARKET_CLOSE[0], minute=MARKET_CLOSE[1], second=0, microsecond=0)
+    close += timedelta(minutes=settle_minutes)
+    if close > local:
+        close -= timedelta(days=1)
+    while close.weekday() >= 5:
+        close -= timedelta(days=1)
+    return close
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout):
+        """Take one token, waiting up to timeout seconds; False if none came free"""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class AlphaVantageClient:
+    """TIME_SERIES_DAILY client on a pooled, keep-alive HTTP session"""
+
+    def __init__(self, base_url, api_key, timeout=10, pool_size=10, rate_limiter=None, rate_wait=0,
+                 on_request=None):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.rate_wait = rate_wait
+        # Optional observer called with (seconds, outcome) for every HTTP call
+        self.on_request = on_request
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _observe(self, started, outcome):
+        if self.on_request is not None:
+            self.on_request(time.perf_counter() - started, outcome)
+
+    def fetch_daily(self, symbol, outputsize='compact'):
+        """
+        Fetch and parse a daily OHLCV series
+
+        Returns:
+            dict: {'bars': [...newest first...], 'metadata': {...}}
+        """
+        params = {
+            'function': 'TIME_SERIES_DAILY',
+            'symbol': symbol,
+            'outputsize': outputsize,
+            'apikey': self.api_key
+        }
+
+        # Stay inside the upstream quota rather than spend a call on a "Note"
+        if self.rate_limiter and not self.rate_limiter.acquire(self.rate_wait):
+            raise UpstreamError('API rate limit exceeded. Try again in a minute.', 429)
+
+        started = time.perf_counter()
+        try:
+            response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+            data = response.json()
+        except (requests.RequestException, ValueError) as e:
+            self._observe(started, 'error')
+            raise UpstreamError(f'API request failed: {str(e)}', 500)
+        self._observe(started, 'ok')
+
+        # Check for API errors
+        if "Error Message" in data:
+            raise UpstreamError(f'Invalid symbol: {symbol}', 400)
+
+        if "Note" in data or "Information" in data:
+            raise UpstreamError('API rate limit exceeded. Try again in a minute.', 429)
+
+        time_series_key = "Time Series (Daily)"
+        if time_series_key not in data:
+            raise UpstreamError('No data available for this symbol', 404)
+
+        bars = [
+            {
+                'date': date_str,
+                'open': float(daily_data['1. open']),
+                'high': float(daily_data['2. high']),
+                'low': float(daily_data['3. low']),
+                'close': float(daily_data['4. close']),
+                'volume': int(daily_data['5. volume'])
+            }
+            for date_str, daily_data in data[time_series_key].items()
+        ]
+        bars.sort(key=lambda x: x['date'], reverse=True)
+
+        metadata = data.get("Meta Data", {})
+        return {
+            'bars': bars,
+            'metadata': {
+                'symbol': metadata.get('2. Symbol', symbol),
+                'last_refreshed': metadata.get('3. Last Refreshed', ''),
+                'timezone': metadata.get('5. Time Zone', 'US/Eastern')
+            }
+        }
+
+
+class PriceStore:
+    """
+    Incremental store of daily bars per symbol in front of Alpha Vantage
+
+    The first request for a symbol backfills its full history; after that
+    only the compact (last 100 days) series is fetched and merged in. A
+    symbol is synced at most once per US market close (plus a settle delay
+    for the upstream to publish the day's bar), and every request is then
+    answered with a range scan of daily_prices. Concurrent syncs of the
+    same symbol share a single upstream fetch.
+    """
+
+    def __init__(self, client, settle_minutes=30):
+        self.client = client
+        self.settle_minutes = settle_minutes
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def is_fresh(self, state, now=None):
+        if state is None or state.fetched_at is None or state.backfilled_at is None:
+            return False
+        now = now or datetime.now(timezone.utc)
+        fetched_at = state.fetched_at.replace(tzinfo=timezone.utc)
+        return fetched_at >= last_market_close(now, self.settle_minutes)
+
+    def _needs_backfill(self, session, symbol, state):
+        """Full history is needed first, and again if compact can't bridge the gap"""
+        if state is None or state.backfilled_at is None:
+            return True
+        latest = session.query(db.func.max(DailyPrice.date)).filter(
+            DailyPrice.symbol == symbol
+        ).scalar()
+        return latest is None or latest < datetime.utcnow().date() - COMPACT_COVERAGE
+
+    def _sync(self, symbol):
+        """
+        Fetch the delta from upstream and merge it into daily_prices
+
+        Runs on its own session, so committing the merge leaves the objects
+        the request's session has loaded untouched.
+        """
+        with Session(db.engine) as session:
+            state = session.get(PriceSymbol, symbol)
+            if self.is_fresh(state):
+                # Another request or worker synced this symbol while we waited
+                return
+
+            backfill = self._needs_backfill(session, symbol, state)
+            series = self.client.fetch_daily(symbol, 'full' if backfill else 'compact')
+            now = datetime.utcnow()
+
+            # Upserts, so workers syncing the same symbol at once both succeed;
+            # bars already stored are overwritten, as the latest day may have
+            # been revised since it was fetched
+            dialect = postgresql if session.get_bind().dialect.name == 'postgresql' else sqlite
+            if series['bars']:
+                stmt = dialect.insert(DailyPrice.__table__)
+                session.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=['symbol', 'date'],
+                        set_={name: stmt.excluded[name] for name in ('open', 'high', 'low', 'close', 'volume')}
+                    ),
+                    [
+                        {
+                            'symbol': symbol,
+                            'date': datetime.strptime(bar['date'], '%Y-%m-%d').date(),
+                            'open': bar['open'],
+                            'high': bar['high'],
+                            'low': bar['low'],
+                            'close': bar['close'],
+                            'volume': bar['volume']
+                        }
+                        for bar in series['bars']
+                    ]
+                )
+
+            stmt = dialect.insert(PriceSymbol.__table__).values(
+                symbol=symbol,
+                fetched_at=now,
+                backfilled_at=now if backfill else None,
+                last_refreshed=series['metadata']['last_refreshed'],
+                timezone=series['metadata']['timezone']
+            )
+            updates = {name: stmt.excluded[name] for name in ('fetched_at', 'last_refreshed', 'timezone')}
+            if backfill:
+                updates['backfilled_at'] = stmt.excluded.backfilled_at
+            session.execute(stmt.on_conflict_do_update(index_elements=['symbol'], set_=updates))
+            session.commit()
+
+    def _sync_once(self, symbol):
+        """Sync symbol, or wait for the sync another thread already started"""
+        with self._lock:
+            future = self._inflight.get(symbol)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[symbol] = future
+
+        if not leader:
+            future.result()
+            return
+
+        try:
+            self._sync(symbol)
+            future.set_result(None)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[symbol]
+
+    def get_daily(self, symbol, outputsize='compact', start=None, end=None):
+        """
+        Daily series for symbol, synced from upstream when stale
+
+        Args:
+            symbol: Ticker symbol
+            outputsize: 'compact' (latest 100 bars) or 'full'
+            start, end: Optional date bounds (inclusive); override outputsize
+
+        Returns:
+            tuple: (series, cached) where series has 'bars' (newest first)
+            and 'metadata', and cached is False if upstream was called
+        """
+        symbol = symbol.upper()
+        if not SYMBOL_PATTERN.fullmatch(symbol):
+            raise UpstreamError(f'Invalid symbol: {symbol}', 400)
+        if outputsize not in OUTPUT_SIZES:
+            raise UpstreamError("outputsize must be 'compact' or 'full'", 400)
+
+        state = db.session.get(PriceSymbol, symbol)
+        cached = self.is_fresh(state)
+        if not cached:
+            try:
+                self._sync_once(symbol)
+            except UpstreamError as e:
+                # Serve what we already have rather than fail on a rate limit
+                if e.status_code != 429 or state is None or state.backfilled_at is None:
+                    raise
+            # Reload just this symbol's sync state, not the whole session
+            state = db.session.get(PriceSymbol, symbol, populate_existing=True)
+
+        query = db.session.query(
+            DailyPrice.date, DailyPrice.open, DailyPrice.high,
+            DailyPrice.low, DailyPrice.close, DailyPrice.volume
+        ).filter(
+            DailyPrice.symbol == symbol
+        )
+        if start:
+            query = query.filter(DailyPrice.date >= start)
+        if end:
+            query = query.filter(DailyPrice.date <= end)
+        query = query.order_by(DailyPrice.date.desc())
+        if outputsize == 'compact' and not (start or end):
+            query = query.limit(COMPACT_DAYS)
+
+        bars = [
+            {
+                'date': row.date.isoformat(),
+                'open': float(row.open),
+                'high': float(row.high),
+                'low': float(row.low),
+                'close': float(row.close),
+                'volume': int(row.volume)
+            }
+            for row in query
+        ]
+
+        return {
+            'bars': bars,
+            'metadata': {
+                'symbol': symbol,
+                'last_refreshed': state.last_refreshed or '',
+                'timezone': state.timezone or 'US/Eastern'
+            }
+        }, cached
+
+
+_store_lock = threading.Lock()
+
+
+def get_price_store():
+    """Price store for the current app, created on first use"""
+    with _store_lock:
+        store = current_app.extensions.get('price_store')
+        if store is None:
+            metrics = current_app.extensions.get('metrics')
+            rate_limiter = TokenBucket(
+                current_app.config['ALPHA_VANTAGE_CALLS_PER_MINUTE'] / 60,
+                current_app.config['ALPHA_VANTAGE_BURST']
+            )
+            client = AlphaVantageClient(
+                current_app.config['ALPHA_VANTAGE_URL'],
+                current_app.config['ALPHA_VANTAGE_API_KEY'],
+                current_app.config['ALPHA_VANTAGE_TIMEOUT'],
+                rate_limiter=rate_limiter,
+                rate_wait=current_app.config['ALPHA_VANTAGE_RATE_WAIT'],
+                on_request=metrics.upstream_observer('alpha_vantage') if metrics else None
+            )
+            store = PriceStore(client, current_app.config['PRICE_CACHE_SETTLE_MINUTES'])
+            current_app.extensions['price_store'] = store
+        return store
+
+
+def get_daily_batch(symbols, outputsize='compact', start=None, end=None):
+    """
+    Daily series for many symbols, syncing the stale ones concurrently
+
+    Fresh symbols are answered from the local store; stale or missing ones
+    are fetched on a bounded thread pool, with upstream calls throttled by
+    the client's token bucket.
+
+    Returns:
+        dict: symbol -> {'success', 'status', ...series or 'error'}
+    """
+    app = current_app._get_current_object()
+    store = get_price_store()
+
+    def load(symbol):
+        with app.app_context():
+            try:
+                series, cached = store.get_daily(symbol, outputsize, start, end)
+                return {
+                    'success': True,
+                    'status': 200,
+                    'data': series['bars'],
+                    'metadata': series['metadata'],
+                    'count': len(series['bars']),
+                    'cached': cached
+                }
+            except UpstreamError as e:
+                return {'success': False, 'status': e.status_code, 'error': str(e)}
+            except Exception as e:
+                print(f"Error loading stock data for {symbol}: {e}")
+                return {'success': False, 'status': 500, 'error': str(e)}
+
+    workers = min(app.config['STOCK_BATCH_WORKERS'], len(symbols)) or 1
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='stock-batch') as executor:
+        return dict(zip(symbols, executor.map(load, symbols)))
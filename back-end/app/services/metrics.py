@@ -0,0 +1,224 @@
+import hmac
+import threading
+import time
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from app import db
+
+# Seconds; Prometheus' default latency buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class Counter:
+    """Monotonic counter with labels, in Prometheus text format"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames=()):
+        # The family is named like its samples, as text format 0.0.4 requires
+        self.name = f'{name}_total'
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield f'{self.name}{_format_labels(self.labelnames, key)} {value}'
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels, in Prometheus text format"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            snapshot = {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+        for key, (counts, total, count) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f'{self.name}_bucket{_format_labels(self.labelnames, key, [("le", repr(float(bound)))])} {cumulative}'
+            yield f'{self.name}_bucket{_format_labels(self.labelnames, key, [("le", "+Inf")])} {count}'
+            yield f'{self.name}_sum{_format_labels(self.labelnames, key)} {total}'
+            yield f'{self.name}_count{_format_labels(self.labelnames, key)} {count}'
+
+
+class Metrics:
+    """
+    Request, SQL and upstream HTTP instrumentation for one app
+
+    Latency is recorded per endpoint (the route's endpoint name, so URL
+    parameters don't explode the label set). SQL statements are timed by
+    engine events and attributed to the request running them; statements
+    and upstream calls made outside a request still count towards the
+    global histograms.
+    """
+
+    def __init__(self, slow_request_seconds, slow_query_seconds, logger):
+        self.slow_request_seconds = slow_request_seconds
+        self.slow_query_seconds = slow_query_seconds
+        self.logger = logger
+
+        self.request_latency = Histogram(
+            'http_request_duration_seconds', 'Time spent handling a request',
+            ('endpoint', 'method', 'status')
+        )
+        self.request_queries = Histogram(
+            'http_request_sql_statements', 'SQL statements executed per request',
+            ('endpoint',), QUERY_COUNT_BUCKETS
+        )
+        self.request_db_time = Histogram(
+            'http_request_db_duration_seconds', 'Time spent in SQL per request', ('endpoint',)
+        )
+        self.query_latency = Histogram('db_query_duration_seconds', 'Time per SQL statement')
+        self.upstream_latency = Histogram(
+            'upstream_request_duration_seconds', 'Time per upstream HTTP call', ('service', 'outcome')
+        )
+        self.slow_requests = Counter('slow_requests', 'Requests slower than SLOW_REQUEST_SECONDS', ('endpoint',))
+        self.slow_queries = Counter('slow_queries', 'SQL statements slower than SLOW_QUERY_SECONDS')
+        self._metrics = (
+            self.request_latency, self.request_queries, self.request_db_time, self.query_latency,
+            self.upstream_latency, self.slow_requests, self.slow_queries
+        )
+
+    # Request hooks
+
+    def start_request(self):
+        g.metrics_started = time.perf_counter()
+        g.sql_statements = 0
+        g.sql_seconds = 0.0
+        g.upstream_seconds = 0.0
+
+    def finish_request(self, response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        endpoint = request.endpoint or 'unmatched'
+
+        self.request_latency.observe(elapsed, endpoint=endpoint, method=request.method,
+                                     status=str(response.status_code))
+        self.request_queries.observe(g.sql_statements, endpoint=endpoint)
+        self.request_db_time.observe(g.sql_seconds, endpoint=endpoint)
+
+        if elapsed >= self.slow_request_seconds:
+            self.slow_requests.inc(endpoint=endpoint)
+            self.logger.warning(
+                'Slow request %s %s: %.3fs, %d SQL statements in %.3fs, %.3fs upstream',
+                request.method, request.full_path, elapsed, g.sql_statements, g.sql_seconds,
+                g.upstream_seconds
+            )
+        return response
+
+    # Engine events
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_started'].pop()
+        self.query_latency.observe(elapsed)
+        if has_request_context() and 'sql_statements' in g:
+            g.sql_statements += 1
+            g.sql_seconds += elapsed
+        if elapsed >= self.slow_query_seconds:
+            self.slow_queries.inc()
+            self.logger.warning('Slow query (%.3fs): %s', elapsed, ' '.join(statement.split())[:500])
+
+    def handle_error(self, exception_context):
+        # A failed statement never reaches after_cursor_execute
+        connection = exception_context.connection
+        if connection is not None and connection.info.get('query_started'):
+            connection.info['query_started'].pop()
+
+    # Upstream HTTP
+
+    def upstream_observer(self, service):
+        """Callback for an HTTP client: observe(seconds, outcome)"""
+        def observe(seconds, outcome):
+            self.upstream_latency.observe(seconds, service=service, outcome=outcome)
+            if has_request_context() and 'upstream_seconds' in g:
+                g.upstream_seconds += seconds
+        return observe
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.help_text}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+def get_metrics():
+    """Metrics for the current app, or None when METRICS_ENABLED is off"""
+    return current_app.extensions.get('metrics')
+
+
+def init_metrics(app):
+    """Register the request hooks, engine events and /metrics route (behind METRICS_TOKEN if set)"""
+    metrics = Metrics(
+        app.config['SLOW_REQUEST_SECONDS'],
+        app.config['SLOW_QUERY_SECONDS'],
+        app.logger
+    )
+    app.extensions['metrics'] = metrics
+
+    app.before_request(metrics.start_request)
+    app.after_request(metrics.finish_request)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', metrics.before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', metrics.after_cursor_execute)
+    event.listen(engine, 'handle_error', metrics.handle_error)
+
+    @app.route('/metrics')
+    def prometheus_metrics():
+        token = app.config.get('METRICS_TOKEN')
+        if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return Response('Unauthorized\n', status=401, headers={'WWW-Authenticate': 'Bearer'})
+        return Response(metrics.render(), content_type=CONTENT_TYPE)
+
+    return metrics
@@ -0,0 +1,222 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from flask import current_app
+from sqlalchemy import literal, select, tuple_
+from sqlalchemy.orm import load_only, selectinload
+from app import db
+from app.models.financial import FinancialStatement, KPIMetric
+
+# Fields a client may request with ?fields=, in to_dict() order
+STATEMENT_FIELDS = {
+    'id': FinancialStatement.id,
+    'file_name': FinancialStatement.file_name,
+    'upload_date': FinancialStatement.upload_date,
+    'company_name': FinancialStatement.company_name,
+    'period_start': FinancialStatement.period_start,
+    'period_end': FinancialStatement.period_end,
+    'statement_type': FinancialStatement.statement_type
+}
+
+KPI_FIELDS = {
+    'id': KPIMetric.id,
+    'statement_id': KPIMetric.statement_id,
+    'metric_name': KPIMetric.metric_name,
+    'metric_value': KPIMetric.metric_value,
+    'metric_category': KPIMetric.metric_category,
+    'calculation_date': KPIMetric.calculation_date
+}
+
+# Newest statements first; upload_date is always set by its column default
+STATEMENT_KEYS = ('upload_date', 'id')
+KPI_KEYS = ('id',)
+
+STREAM_BATCH_SIZE = 200
+
+
+def serialize_value(value):
+    """Column value as a JSON-ready scalar"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def encode_cursor(values):
+    """Opaque, URL-safe cursor for the key values of the last row on a page"""
+    raw = json.dumps([serialize_value(v) for v in values]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    """
+    Key values from a cursor made by encode_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        return [
+            datetime.fromisoformat(value) if column.type.python_type is datetime else value
+            for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError('Invalid cursor')
+
+
+def parse_page_args(args, available_fields):
+    """
+    Read cursor, limit and fields query parameters
+
+    Args:
+        args: request.args
+        available_fields: Mapping of field name to column for the resource
+
+    Returns:
+        tuple: (cursor or None, limit, list of field names)
+
+    Raises:
+        ValueError: If limit or fields are invalid
+    """
+    limit = args.get('limit', current_app.config['API_PAGE_SIZE'], type=int)
+    max_limit = current_app.config['API_MAX_PAGE_SIZE']
+    if not 1 <= limit <= max_limit:
+        raise ValueError(f'limit must be between 1 and {max_limit}')
+
+    fields = list(available_fields)
+    if args.get('fields'):
+        fields = [name.strip() for name in args['fields'].split(',') if name.strip()]
+        unknown = [name for name in fields if name not in available_fields]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Choose from {', '.join(available_fields)}")
+
+    return args.get('cursor'), limit, fields
+
+
+def _after_cursor(key_columns, cursor, descending):
+    """Row-value comparison selecting the rows that follow cursor"""
+    key_values = decode_cursor(cursor, key_columns)
+    row_key = tuple_(*key_columns)
+    after = tuple_(*(literal(value, column.type) for column, value in zip(key_columns, key_values)))
+    return row_key < after if descending else row_key > after
+
+
+def keyset_page(available_fields, keys, criteria=(), cursor=None, limit=100, fields=None, descending=False):
+    """
+    Run one keyset-paginated query and stream it as a JSON object
+
+    Only the requested fields (plus the key columns the next cursor needs)
+    are selected, the cursor becomes an index-friendly row comparison
+    instead of an OFFSET, and one extra row is fetched to tell whether
+    another page follows. The query runs before this returns, so database
+    errors surface to the caller; rows are then encoded one at a time.
+
+    Returns:
+        generator: Chunks of '{"success": true, "data": [...], "count": n, "next_cursor": ...}'
+    """
+    fields = fields or list(available_fields)
+    key_columns = [available_fields[key] for key in keys]
+    selected = list(dict.fromkeys([*fields, *keys]))
+
+    query = select(*(available_fields[name] for name in selected)).where(*criteria)
+    if cursor:
+        query = query.where(_after_cursor(key_columns, cursor, descending))
+    order = [column.desc() if descending else column.asc() for column in key_columns]
+    query = query.order_by(*order).limit(limit + 1)
+
+    result = db.session.execute(query, execution_options={'yield_per': STREAM_BATCH_SIZE}).mappings()
+    return _stream_page(result, fields, keys, limit)
+
+
+def _stream_page(result, fields, keys, limit):
+    dumps = current_app.json.dumps
+    count = 0
+    last_row = None
+    has_more = False
+
+    yield '{"success": true, "data": ['
+    for row in result:
+        if count == limit:
+            has_more = True
+            break
+        record = {name: serialize_value(row[name]) for name in fields}
+        yield (',' if count else '') + dumps(record)
+        last_row = row
+        count += 1
+    if hasattr(result, 'close'):
+        result.close()
+
+    next_cursor = encode_cursor([last_row[key] for key in keys]) if has_more else None
+    yield f'], "count": {count}, "next_cursor": {dumps(next_cursor)}}}'
+
+
+def statement_criteria(period_from=None, period_to=None):
+    """Statements whose reporting period overlaps [period_from, period_to]"""
+    criteria = []
+    if period_from:
+        criteria.append(FinancialStatement.period_end >= period_from)
+    if period_to:
+        criteria.append(FinancialStatement.period_start <= period_to)
+    return criteria
+
+
+def statement_page(cursor=None, limit=100, fields=None, period_from=None, period_to=None):
+    """Financial statements, newest upload first"""
+    return keyset_page(
+        STATEMENT_FIELDS, STATEMENT_KEYS, statement_criteria(period_from, period_to),
+        cursor, limit, fields, descending=True
+    )
+
+
+def statement_page_with_kpis(cursor=None, limit=100, fields=None, period_from=None,
+                             period_to=None, metric_category=None):
+    """
+    One page of statements with their KPI metrics nested under 'kpis'
+
+    The page is read with the same keyset query as statement_page and its
+    metrics with a single selectinload IN query (filtered by category when
+    given), so the cost is two queries however many statements are on the
+    page. Statements with no matching metrics get an empty list.
+    """
+    fields = fields or list(STATEMENT_FIELDS)
+    key_columns = [STATEMENT_FIELDS[key] for key in STATEMENT_KEYS]
+    selected = list(dict.fromkeys([*fields, *STATEMENT_KEYS]))
+
+    kpis = FinancialStatement.kpi_metrics
+    if metric_category:
+        kpis = kpis.and_(KPIMetric.metric_category == metric_category)
+
+    query = select(FinancialStatement).options(
+        load_only(*(STATEMENT_FIELDS[name] for name in selected)),
+        selectinload(kpis).options(load_only(*KPI_FIELDS.values()))
+    ).where(*statement_criteria(period_from, period_to))
+    if cursor:
+        query = query.where(_after_cursor(key_columns, cursor, True))
+    query = query.order_by(*(column.desc() for column in key_columns)).limit(limit + 1)
+
+    # populate_existing so already-loaded collections pick up the category filter
+    statements = db.session.execute(query, execution_options={'populate_existing': True}).scalars().all()
+    rows = [
+        {
+            **{name: getattr(statement, name) for name in selected},
+            'kpis': [
+                {name: serialize_value(getattr(kpi, name)) for name in KPI_FIELDS}
+                for kpi in sorted(statement.kpi_metrics, key=lambda kpi: kpi.id)
+            ]
+        }
+        for statement in statements
+    ]
+    return _stream_page(rows, [*fields, 'kpis'], STATEMENT_KEYS, limit)
+
+
+def kpi_page(statement_id, cursor=None, limit=100, fields=None):
+    """KPI metrics for one statement in insertion order"""
+    return keyset_page(
+        KPI_FIELDS, KPI_KEYS, (KPIMetric.statement_id == statement_id,), cursor, limit, fields
+    )
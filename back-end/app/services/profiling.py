@@ -0,0 +1,139 @@
+import cProfile
+import hashlib
+import hmac
+import os
+import re
+import time
+from datetime import datetime
+import click
+from flask import current_app, g, request
+from flask.cli import AppGroup
+from app.config import DEFAULT_SECRET_KEY
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_MODES = ('off', 'header', 'all')
+
+
+def sign_profile_request(secret_key, path, expires):
+    """HMAC-SHA256 over the expiry time and request path"""
+    message = f"{expires}:{path}".encode('utf-8')
+    return hmac.new(secret_key.encode('utf-8'), message, hashlib.sha256).hexdigest()
+
+
+def profile_token(secret_key, path, ttl=300):
+    """X-Profile header value allowing path to be profiled for ttl seconds"""
+    expires = int(time.time()) + ttl
+    return f"{expires}:{sign_profile_request(secret_key, path, expires)}"
+
+
+def verify_profile_token(secret_key, path, token):
+    """True if token was made by profile_token for path and has not expired"""
+    expires, _, signature = (token or '').partition(':')
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, sign_profile_request(secret_key, path, int(expires)))
+
+
+class RequestProfiler:
+    """
+    Deterministic cProfile capture of individual requests
+
+    A profiled request is written to the profile directory as a pstats
+    file named after its time and endpoint; the name is returned in the
+    X-Profile-File response header. Only the newest max_files profiles are
+    kept. Streamed responses are profiled until the stream is closed. Load
+    a file with python -m pstats <file>, snakeviz or speedscope.
+    """
+
+    def __init__(self, mode, directory, secret_key, max_files=200):
+        self.mode = mode
+        self.directory = os.path.abspath(directory)
+        self.secret_key = secret_key
+        self.max_files = max_files
+        os.makedirs(self.directory, exist_ok=True)
+
+    def wants_profile(self):
+        if self.mode == 'all':
+            return True
+        return verify_profile_token(self.secret_key, request.path, request.headers.get(PROFILE_HEADER))
+
+    def start(self):
+        if not self.wants_profile():
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active in this process
+            current_app.logger.warning('Profiling skipped for %s: profiler busy', request.path)
+            return
+        endpoint = re.sub(r'[^A-Za-z0-9_.-]', '_', request.endpoint or 'unmatched')
+        g.profiler = profiler
+        g.profile_started = time.perf_counter()
+        g.profile_name = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{endpoint}.prof"
+
+    def tag_response(self, response):
+        if 'profile_name' in g:
+            response.headers['X-Profile-File'] = g.profile_name
+        return response
+
+    def finish(self, exc=None):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return
+        profiler.disable()
+        path = os.path.join(self.directory, g.profile_name)
+        profiler.dump_stats(path)
+        current_app.logger.info(
+            'Profiled %s %s in %.3fs -> %s',
+            request.method, request.path, time.perf_counter() - g.profile_started, path
+        )
+        self.prune()
+
+    def prune(self):
+        """Delete the oldest profiles beyond max_files"""
+        # Names start with the capture time, so they sort oldest first
+        profiles = sorted(name for name in os.listdir(self.directory) if name.endswith('.prof'))
+        for name in profiles[:max(len(profiles) - self.max_files, 0)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                # Pruned by another worker
+                pass
+
+
+def init_profiling(app):
+    """
+    Register profiling hooks when PROFILE_MODE is 'header' or 'all'
+
+    With the default 'off' no hook is registered at all, so requests
+    pay nothing for the feature. Header mode refuses to start on the
+    placeholder SECRET_KEY, as anyone could then sign X-Profile tokens.
+    """
+    mode = app.config['PROFILE_MODE']
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"PROFILE_MODE must be one of {', '.join(PROFILE_MODES)}")
+    if mode == 'off':
+        return None
+    if mode == 'header' and app.config['SECRET_KEY'] in (None, '', DEFAULT_SECRET_KEY):
+        raise ValueError("PROFILE_MODE 'header' needs SECRET_KEY set to a private value")
+
+    profiler = RequestProfiler(
+        mode, app.config['PROFILE_DIR'], app.config['SECRET_KEY'], app.config['PROFILE_MAX_FILES']
+    )
+    app.extensions['request_profiler'] = profiler
+    app.before_request(profiler.start)
+    app.after_request(profiler.tag_response)
+    app.teardown_request(profiler.finish)
+    return profiler
+
+
+profiling_cli = AppGroup('profiling', help='Profile individual requests.')
+
+
+@profiling_cli.command('token')
+@click.argument('path')
+@click.option('--ttl', default=300, show_default=True, help='Seconds the token stays valid.')
+def token_command(path, ttl):
+    """Print an X-Profile header value for PATH, e.g. /api/generate-pdf."""
+    click.echo(f"{PROFILE_HEADER}: {profile_token(current_app.config['SECRET_KEY'], path, ttl)}")
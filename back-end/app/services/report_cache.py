@@ -0,0 +1,100 @@
+import hashlib
+import os
+import threading
+import time
+from flask import current_app
+
+
+class ReportCache:
+    """
+    Content-addressed store of generated PDF reports on local disk
+
+    Entries are named by a hash of the report scope and its data version, so
+    a new ingest produces a new key and stale reports simply age out. Reads
+    refresh an entry's mtime, which eviction uses as its LRU clock.
+    """
+
+    def __init__(self, directory, max_bytes, max_age):
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(scope, version):
+        return hashlib.sha256(f"{scope}|{version}".encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def get(self, key):
+        """Return the cached file path for key, or None on a miss"""
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                return None
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key, data):
+        """
+        Store rendered PDF bytes under key and return the cached path
+
+        The file is moved into place atomically, so concurrent readers never
+        see a half-written PDF.
+        """
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.evict()
+        return path
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones over max_bytes"""
+        with self._lock:
+            now = time.time()
+            entries = []
+            for entry in os.scandir(self.directory):
+                if not entry.name.endswith('.pdf'):
+                    continue
+                stat = entry.stat()
+                if now - stat.st_mtime > self.max_age:
+                    self._remove(entry.path)
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def get_report_cache():
+    """Report cache for the current app, created on first use"""
+    cache = current_app.extensions.get('report_cache')
+    if cache is None:
+        cache = ReportCache(
+            current_app.config['REPORT_CACHE_DIR'],
+            current_app.config['REPORT_CACHE_MAX_BYTES'],
+            current_app.config['REPORT_CACHE_MAX_AGE']
+        )
+        current_app.extensions['report_cache'] = cache
+    return cache
@@ -0,0 +1,148 @@
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from app.services.reports import build_report
+
+
+class ReportQueueFull(Exception):
+    """Raised when the report queue already holds its maximum of pending jobs"""
+
+
+class ReportJobQueue:
+    """
+    Bounded pool that renders PDF reports off the request thread
+
+    max_workers reports render at once and at most max_pending jobs may be
+    queued or running; beyond that submit() refuses new work instead of
+    letting requests pile up. Jobs for a scope that is already queued or
+    running here are coalesced onto the existing job.
+
+    Every job's state is also written to a JSON file in directory, so a
+    status poll or download that reaches another worker process still
+    finds it. Only this process renders its own jobs.
+    """
+
+    def __init__(self, app, directory, max_workers, max_pending, retention):
+        self.app = app
+        self.directory = os.path.abspath(directory)
+        self.retention = retention
+        os.makedirs(self.directory, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='report-job')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, selected_date=None):
+        with self._lock:
+            self._prune()
+            for job in self._jobs.values():
+                if job['date'] == selected_date and job['status'] in ('queued', 'running'):
+                    return dict(job)
+
+            if not self._slots.acquire(blocking=False):
+                raise ReportQueueFull('Too many reports are being generated, try again shortly')
+
+            job = {
+                'id': uuid.uuid4().hex,
+                'status': 'queued',
+                'date': selected_date,
+                'created_at': time.time(),
+                'finished_at': None,
+                'cache_key': None,
+                'error': None
+            }
+            try:
+                self._jobs[job['id']] = job
+                self._save(job)
+                # From here on _run owns the slot
+                self._executor.submit(self._run, job)
+            except Exception:
+                self._jobs.pop(job['id'], None)
+                self._slots.release()
+                raise
+
+        return dict(job)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                return dict(job)
+
+        # Submitted to another worker process
+        if not re.fullmatch(r'[0-9a-f]{32}', job_id):
+            return None
+        try:
+            with open(self._path(job_id)) as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _path(self, job_id):
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def _save(self, job):
+        """Write a job's state atomically; call with the lock held"""
+        path = self._path(job['id'])
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(job, file)
+        os.replace(tmp_path, path)
+
+    def _update(self, job, **changes):
+        with self._lock:
+            job.update(changes)
+            self._save(job)
+
+    def _run(self, job):
+        try:
+            self._update(job, status='running')
+            with self.app.app_context():
+                cache_key, _ = build_report(job['date'])
+            self._update(job, status='finished', cache_key=cache_key, finished_at=time.time())
+        except Exception as e:
+            print(f"Error generating report job {job['id']}: {str(e)}")
+            self._update(job, status='failed', error=str(e), finished_at=time.time())
+        finally:
+            self._slots.release()
+
+    def _prune(self):
+        """Forget finished jobs older than the retention period, here and on disk"""
+        cutoff = time.time() - self.retention
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job['finished_at'] and job['finished_at'] < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+        # Files of every worker's jobs; also clears jobs of workers that died mid-render
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.json') and entry.name[:-5] not in self._jobs:
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+_queue_lock = threading.Lock()
+
+
+def get_report_jobs():
+    """Report job queue for the current app, created on first use"""
+    with _queue_lock:
+        queue = current_app.extensions.get('report_jobs')
+        if queue is None:
+            queue = ReportJobQueue(
+                current_app._get_current_object(),
+                os.path.join(current_app.config['REPORT_CACHE_DIR'], 'jobs'),
+                current_app.config['REPORT_JOB_WORKERS'],
+                current_app.config['REPORT_JOB_MAX_PENDING'],
+                current_app.config['REPORT_JOB_RETENTION']
+            )
+            current_app.extensions['report_jobs'] = queue
+        return queue
@@ -0,0 +1,49 @@
+import io
+from datetime import datetime
+from app.services.report_cache import get_report_cache
+from app.services.snapshots import snapshot_version
+
+
+def report_filename(selected_date, generated_at=None):
+    """Download name for a report, e.g. investment_report_2025-08-01_20250802_093000.pdf"""
+    generated_at = generated_at or datetime.now()
+    date_suffix = f"_{selected_date}" if selected_date else "_all"
+    return f"investment_report{date_suffix}_{generated_at.strftime('%Y%m%d_%H%M%S')}.pdf"
+
+
+def report_cache_key(selected_date=None):
+    """Cache key for a report scope at its current data version"""
+    target_date = datetime.strptime(selected_date, '%Y-%m-%d').date() if selected_date else None
+    return get_report_cache().key(selected_date or 'all', snapshot_version(target_date))
+
+
+def render_report(selected_date=None):
+    """Render a report straight into memory and return the PDF bytes"""
+    from run_report_data import generate_pdf_from_sql_data
+
+    buffer = io.BytesIO()
+    generate_pdf_from_sql_data(buffer, selected_date=selected_date)
+    return buffer.getvalue()
+
+
+def build_report(selected_date=None):
+    """
+    Return the cached PDF for a report scope, rendering it on a miss
+
+    Reports are cached by scope and data version, so repeat requests skip
+    the query and ReportLab render until new data is ingested.
+
+    Args:
+        selected_date: Date filter in YYYY-MM-DD format (optional)
+
+    Returns:
+        tuple: (cache_key, pdf_path)
+    """
+    cache = get_report_cache()
+    cache_key = report_cache_key(selected_date)
+    pdf_path = cache.get(cache_key)
+
+    if pdf_path is None:
+        pdf_path = cache.put(cache_key, render_report(selected_date))
+
+    return cache_key, pdf_path
@@ -0,0 +1,221 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+from flask import Response, current_app, has_app_context, make_response, request
+from sqlalchemy import case, event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app import db
+from app.models.financial import DataVersion
+
+_cache_lock = threading.Lock()
+
+
+class ResponseCache:
+    """
+    LRU of rendered JSON responses, validated against data_versions
+
+    Every committed write bumps, in the same transaction, the data_versions
+    row of each table it touched. A cached endpoint's ETag is derived from
+    the request URL and the versions of the tables it reads, which are read
+    from the database on every request. Every worker process therefore
+    agrees on them, and a write committed by any worker invalidates the
+    others' 304 answers and cached bodies straight away. The bodies
+    themselves stay in this process.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def versions(self, tables):
+        """Current (version, modified) of each table, as a comparable tuple"""
+        rows = dict(
+            (name, (version, modified)) for name, version, modified in db.session.execute(
+                select(DataVersion.table_name, DataVersion.version, DataVersion.modified).where(
+                    DataVersion.table_name.in_(tables)
+                )
+            )
+        )
+        return tuple(rows.get(table, (0, 0)) for table in tables)
+
+    def validators(self, tables, key):
+        """
+        ETag and Last-Modified for a request key reading the given tables
+
+        Last-Modified is None until one of the tables has been written.
+        """
+        versions = self.versions(tables)
+        token = '|'.join(f"{table}:{version}:{modified}" for table, (version, modified) in zip(tables, versions))
+        token = f"{token}|{key}"
+        modified = max(modified for _, modified in versions)
+        last_modified = datetime.fromtimestamp(modified, timezone.utc) if modified else None
+        return hashlib.sha1(token.encode('utf-8')).hexdigest(), last_modified
+
+    def get(self, key, etag):
+        """Return the cached (body, mimetype) for key at etag, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != etag:
+                return None
+            self._entries.move_to_end(key)
+            return entry[2], entry[3]
+
+    def put(self, key, etag, tables, body, mimetype):
+        with self._lock:
+            self._entries[key] = (etag, frozenset(tables), body, mimetype)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, *tables):
+        """Drop cached responses that read tables this process just wrote"""
+        changed = set(tables)
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry[1] & changed]:
+                del self._entries[key]
+
+
+def bump_versions(connection, tables):
+    """
+    Increment the data_versions rows of tables on the given connection
+
+    Runs inside the writing transaction, so the new versions become visible
+    together with the rows they describe, and roll back with them.
+    modified always moves forward by at least a second, so If-Modified-Since
+    never hides a write made within the same second as the last response.
+    """
+    now = int(time.time())
+    table = DataVersion.__table__
+    dialect = postgresql if connection.dialect.name == 'postgresql' else sqlite
+    stmt = dialect.insert(table).values([
+        # Sorted, so concurrent writers lock the rows in the same order
+        {'table_name': name, 'version': 1, 'modified': now} for name in sorted(tables)
+    ])
+    connection.execute(stmt.on_conflict_do_update(
+        index_elements=[table.c.table_name],
+        set_={
+            'version': table.c.version + 1,
+            'modified': case((table.c.modified >= now, table.c.modified + 1), else_=now)
+        }
+    ))
+
+
+def get_response_cache():
+    """Response cache for the current app, created on first use"""
+    with _cache_lock:
+        cache = current_app.extensions.get('response_cache')
+        if cache is None:
+            cache = ResponseCache(current_app.config['RESPONSE_CACHE_MAX_ENTRIES'])
+            current_app.extensions['response_cache'] = cache
+        return cache
+
+
+def _pending_tables(session):
+    return session.info.setdefault('changed_tables', set())
+
+
+def mark_tables_changed(*tables, session=None):
+    """
+    Flag tables written outside the ORM unit of work
+
+    Core statements run on the session's connection (bulk ingest, COPY)
+    are invisible to the flush events, so their callers name the tables
+    here. Versions are bumped as the transaction commits.
+    """
+    _pending_tables(session or db.session()).update(tables)
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_flushed_tables(session, flush_context):
+    changed = _pending_tables(session)
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(instance, '__table__', None)
+        if table is not None:
+            changed.add(table.name)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _track_bulk_statements(orm_execute_state):
+    # session.execute(insert/update/delete(Model)) bypasses the flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _pending_tables(orm_execute_state.session).add(orm_execute_state.statement.table.name)
+
+
+@event.listens_for(Session, 'before_commit')
+def _bump_changed_tables(session):
+    # Commit flushes after this event, so flush now to see every write
+    session.flush()
+    changed = session.info.get('changed_tables')
+    if changed:
+        bump_versions(session.connection(), changed)
+
+
+@event.listens_for(Session, 'after_commit')
+def _discard_committed_tables(session):
+    changed = session.info.pop('changed_tables', None)
+    if changed:
+        cache = current_app.extensions.get('response_cache') if has_app_context() else None
+        if cache is not None:
+            cache.discard(*changed)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back_tables(session):
+    session.info.pop('changed_tables', None)
+
+
+def cached_response(*tables):
+    """
+    Serve a GET view through the response cache
+
+    Adds ETag, Last-Modified and Cache-Control: no-cache to successful
+    responses, answers matching If-None-Match / If-Modified-Since requests
+    with 304 before the view (and its queries) runs, and replays rendered
+    bodies from the LRU until one of the tables is written. Streamed
+    responses get the validators but are passed through, not buffered.
+
+    Args:
+        *tables: Names of the tables the view reads
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get('RESPONSE_CACHE_ENABLED', True):
+                return view(*args, **kwargs)
+
+            cache = get_response_cache()
+            key = request.full_path
+            etag, last_modified = cache.validators(tables, key)
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            else:
+                not_modified = (
+                    last_modified is not None and request.if_modified_since is not None
+                    and last_modified <= request.if_modified_since
+                )
+            if not_modified:
+                response = Response(status=304)
+            else:
+                cached = cache.get(key, etag)
+                if cached is not None:
+                    response = Response(cached[0], mimetype=cached[1])
+                else:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    if not response.is_streamed:
+                        cache.put(key, etag, tables, response.get_data(), response.mimetype)
+
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
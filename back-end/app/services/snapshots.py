@@ -0,0 +1,104 @@
+from datetime import datetime
+import click
+from flask.cli import AppGroup
+from sqlalchemy import delete, insert, select
+from app import db
+from app.models.financial import Investments, PortfolioSnapshot
+
+SNAPSHOT_COLUMNS = (
+    'valuation_date', 'portfolio', 'investment',
+    'total_units', 'total_cost', 'total_value', 'row_count', 'refreshed_at'
+)
+
+
+def _aggregate_investments(*criteria):
+    """SELECT that rolls raw Investments rows up into snapshot rows"""
+    valuation_day = Investments.valuation_day()
+    return select(
+        valuation_day,
+        Investments.portfolio,
+        Investments.investment,
+        db.func.coalesce(db.func.sum(Investments.units), 0),
+        db.func.coalesce(db.func.sum(Investments.cost), 0),
+        db.func.coalesce(db.func.sum(Investments.value), 0),
+        db.func.count(),
+        db.literal(datetime.utcnow(), db.DateTime)
+    ).where(
+        *criteria
+    ).group_by(
+        valuation_day, Investments.portfolio, Investments.investment
+    )
+
+
+def refresh_snapshots(valuation_date, portfolio_name):
+    """
+    Recompute the rollup for one valuation date and portfolio
+
+    Called by the ingest path inside its transaction, so the snapshot rows
+    commit (or roll back) together with the raw rows they summarise.
+
+    Returns:
+        int: Number of snapshot rows written
+    """
+    db.session.execute(
+        delete(PortfolioSnapshot).where(
+            PortfolioSnapshot.valuation_date == valuation_date,
+            PortfolioSnapshot.portfolio == portfolio_name
+        )
+    )
+    result = db.session.execute(
+        insert(PortfolioSnapshot).from_select(
+            SNAPSHOT_COLUMNS,
+            _aggregate_investments(
+                Investments.valued_on(valuation_date),
+                Investments.portfolio == portfolio_name
+            )
+        )
+    )
+    return result.rowcount
+
+
+def rebuild_snapshots():
+    """
+    Rebuild the whole rollup from the investments table
+
+    Returns:
+        int: Number of snapshot rows written
+    """
+    db.session.execute(delete(PortfolioSnapshot))
+    result = db.session.execute(
+        insert(PortfolioSnapshot).from_select(
+            SNAPSHOT_COLUMNS,
+            _aggregate_investments(Investments.date_of_valuation.isnot(None))
+        )
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def snapshot_version(valuation_date=None):
+    """
+    Cheap data version for a report scope
+
+    Changes whenever ingest refreshes a snapshot row inside the scope (one
+    valuation date, or everything when valuation_date is None).
+    """
+    query = db.session.query(
+        db.func.count(),
+        db.func.max(PortfolioSnapshot.refreshed_at)
+    )
+    if valuation_date is not None:
+        query = query.filter(PortfolioSnapshot.valuation_date == valuation_date)
+
+    row_count, last_refreshed = query.one()
+    return f"{row_count}:{last_refreshed.isoformat() if last_refreshed else '-'}"
+
+
+snapshots_cli = AppGroup('snapshots', help='Maintain the daily portfolio snapshot rollup.')
+
+
+@snapshots_cli.command('rebuild')
+def rebuild_command():
+    """Recompute every snapshot row, e.g. after a backfill."""
+    written = rebuild_snapshots()
+    click.echo(f"Rebuilt {written} snapshot rows")
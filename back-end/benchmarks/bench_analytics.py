@@ -0,0 +1,143 @@
+"""
+Vectorized portfolio analytics vs a per-row Python loop
+
+Generates a (dates x holdings) value/cost history, checks that
+compute_metrics agrees with a straightforward loop implementation, and
+times both. Optionally times loading the same history from the snapshot
+rollup in SQLite.
+
+Usage (from back-end/):
+    python -m benchmarks.bench_analytics
+    python -m benchmarks.bench_analytics --holdings 500 --years 10 --load
+"""
+import argparse
+import math
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.services.analytics import compute_metrics
+
+TRADING_DAYS = 252
+
+
+def synthetic_history(holdings, dates, seed=42):
+    rng = np.random.default_rng(seed)
+    start = date(2015, 1, 2)
+    valuation_dates = [start + timedelta(days=int(i * 365.25 / TRADING_DAYS)) for i in range(dates)]
+    contributions = rng.uniform(0, 50, (dates, holdings)) * (rng.random((dates, holdings)) < 0.05)
+    costs = 1000 + np.cumsum(contributions, axis=0)
+    growth = np.cumprod(1 + rng.normal(0.0003, 0.015, (dates, holdings)), axis=0)
+    values = costs * growth
+    names = [f'Holding {h:04d}' for h in range(holdings)]
+    return valuation_dates, names, values, costs
+
+
+def loop_metrics(dates, values, costs, window):
+    """Reference implementation: one Python iteration per date and holding"""
+    n_dates, n_holdings = len(values), len(values[0])
+    totals_value = [sum(values[t][h] for h in range(n_holdings)) for t in range(n_dates)]
+    totals_cost = [sum(costs[t][h] for h in range(n_holdings)) for t in range(n_dates)]
+    contributions = [0.0] * n_holdings
+    returns = []
+    for t in range(1, n_dates):
+        flow = totals_cost[t] - totals_cost[t - 1]
+        denominator = totals_value[t - 1] + 0.5 * flow
+        period = 0.0
+        for h in range(n_holdings):
+            gain = (values[t][h] - values[t - 1][h]) - (costs[t][h] - costs[t - 1][h])
+            share = gain / denominator if denominator > 0 else 0.0
+            contributions[h] += share
+            period += share
+        returns.append(period)
+
+    growth, peak, max_drawdown = 1.0, 1.0, 0.0
+    for r in returns:
+        growth *= 1 + r
+        peak = max(peak, growth)
+        max_drawdown = min(max_drawdown, growth / peak - 1)
+
+    volatility = []
+    for t in range(window, len(returns) + 1):
+        chunk = returns[t - window:t]
+        mean = sum(chunk) / window
+        volatility.append(math.sqrt(sum((x - mean) ** 2 for x in chunk) / (window - 1)))
+
+    return growth - 1, max_drawdown, contributions, volatility
+
+
+def load_from_sqlite(dates, names, values, costs):
+    """Time load_valuation_matrix against a populated snapshot table"""
+    from sqlalchemy import insert
+    from app import create_app, db
+    from app.models.financial import PortfolioSnapshot
+    from app.services.analytics import load_valuation_matrix
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        rows = (
+            {
+                'valuation_date': d, 'portfolio': 'ISA', 'investment': name,
+                'total_units': 1, 'total_cost': float(costs[t, h]),
+                'total_value': float(values[t, h]), 'row_count': 1
+            }
+            for t, d in enumerate(dates) for h, name in enumerate(names)
+        )
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == 50_000:
+                db.session.execute(insert(PortfolioSnapshot), batch)
+                batch = []
+        if batch:
+            db.session.execute(insert(PortfolioSnapshot), batch)
+        db.session.commit()
+
+        started = time.perf_counter()
+        loaded = load_valuation_matrix()
+        elapsed = time.perf_counter() - started
+        assert loaded[2].shape == values.shape
+        return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--holdings', type=int, default=500)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--window', type=int, default=21)
+    parser.add_argument('--load', action='store_true', help='Also time loading from SQLite')
+    args = parser.parse_args()
+
+    n_dates = args.years * TRADING_DAYS
+    dates, names, values, costs = synthetic_history(args.holdings, n_dates)
+    print(f"{args.holdings} holdings x {n_dates} dates ({args.holdings * n_dates:,} cells)")
+
+    started = time.perf_counter()
+    metrics = compute_metrics(dates, names, values, costs, args.window)
+    vectorized = time.perf_counter() - started
+    print(f"compute_metrics (NumPy): {vectorized * 1000:.1f} ms")
+
+    value_rows, cost_rows = values.tolist(), costs.tolist()
+    started = time.perf_counter()
+    twr, max_drawdown, contributions, volatility = loop_metrics(dates, value_rows, cost_rows, args.window)
+    looped = time.perf_counter() - started
+    print(f"per-row Python loop:     {looped * 1000:.1f} ms ({looped / vectorized:.0f}x slower)")
+
+    summary = metrics['summary']
+    assert math.isclose(summary['time_weighted_return'], twr * 100, rel_tol=1e-9, abs_tol=1e-9)
+    assert math.isclose(summary['max_drawdown'], max_drawdown * 100, rel_tol=1e-9, abs_tol=1e-9)
+    by_name = {c['investment']: c['contribution'] for c in metrics['contributions']}
+    assert all(math.isclose(by_name[n], c * 100, rel_tol=1e-6, abs_tol=1e-9) for n, c in zip(names, contributions))
+    rolling = [v for v in metrics['rolling_volatility'] if v is not None]
+    scale = math.sqrt(summary['periods_per_year']) * 100
+    assert all(math.isclose(a, b * scale, rel_tol=1e-6) for a, b in zip(rolling, volatility))
+    print("Results match the loop implementation")
+
+    if args.load:
+        print(f"load_valuation_matrix (SQLite): {load_from_sqlite(dates, names, values, costs) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
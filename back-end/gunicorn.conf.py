@@ -0,0 +1,29 @@
+"""
+Gunicorn settings for wsgi:app
+
+Every worker process builds its own app and connection pool after the fork
+(preload_app stays off), so pooled connections are never shared between
+processes. Size DB_POOL_SIZE so that workers x (pool size + overflow) stays
+below PostgreSQL's max_connections.
+
+State the workers must agree on is shared: response-cache and dashboard
+versions live in the data_versions table, and report jobs are written to
+REPORT_CACHE_DIR/jobs, which every worker must be able to read (same host
+or a shared volume). What stays per process:
+
+- rendered response bodies and the dashboard summary, only ever replayed
+  after their versions are checked against the database;
+- the Alpha Vantage rate limiter, so each worker spends its own
+  ALPHA_VANTAGE_CALLS_PER_MINUTE. Set it to the account quota divided by
+  WSGI_WORKERS when running more than one worker.
+"""
+import multiprocessing
+import os
+
+bind = f"{os.environ.get('FLASK_HOST', '127.0.0.1')}:{os.environ.get('FLASK_PORT', 5000)}"
+workers = int(os.environ.get('WSGI_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('WSGI_THREADS', 4))
+preload_app = False
+timeout = 60  # Longer than the statement timeout, so slow queries fail before the worker is killed
+keepalive = 5
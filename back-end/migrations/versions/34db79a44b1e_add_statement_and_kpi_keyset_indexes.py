@@ -0,0 +1,32 @@
+"""add statement and kpi keyset indexes
+
+Revision ID: 34db79a44b1e
+Revises: 4e839bf8c35f
+Create Date: 2026-10-18 05:53:42.134769
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '34db79a44b1e'
+down_revision = '4e839bf8c35f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('financial_statements', schema=None) as batch_op:
+        batch_op.create_index('ix_financial_statements_upload_date_id', ['upload_date', 'id'], unique=False)
+
+    with op.batch_alter_table('kpi_metrics', schema=None) as batch_op:
+        batch_op.create_index('ix_kpi_metrics_statement_id_id', ['statement_id', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('kpi_metrics', schema=None) as batch_op:
+        batch_op.drop_index('ix_kpi_metrics_statement_id_id')
+
+    with op.batch_alter_table('financial_statements', schema=None) as batch_op:
+        batch_op.drop_index('ix_financial_statements_upload_date_id')
@@ -0,0 +1,29 @@
+"""add data versions
+
+Revision ID: 3e8544fc85e9
+Revises: 34db79a44b1e
+Create Date: 2026-10-18 06:15:20.610462
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e8544fc85e9'
+down_revision = '34db79a44b1e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('data_versions',
+    sa.Column('table_name', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('modified', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+
+
+def downgrade():
+    op.drop_table('data_versions')
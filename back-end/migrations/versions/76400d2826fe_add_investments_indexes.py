@@ -0,0 +1,33 @@
+"""add investments indexes
+
+Revision ID: 76400d2826fe
+Revises: 7ee4bdccecb6
+Create Date: 2026-10-18 05:34:34.783128
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '76400d2826fe'
+down_revision = '7ee4bdccecb6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('investments', schema=None) as batch_op:
+        batch_op.create_index('ix_investments_date_of_valuation', ['date_of_valuation'], unique=False)
+        batch_op.create_index('ix_investments_investment_date', ['investment', 'date_of_valuation'], unique=False)
+
+    # Expression index so DISTINCT date(date_of_valuation) can be read from the index
+    op.create_index('ix_investments_valuation_day', 'investments', [sa.text('date(date_of_valuation)')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_investments_valuation_day', table_name='investments')
+
+    with op.batch_alter_table('investments', schema=None) as batch_op:
+        batch_op.drop_index('ix_investments_investment_date')
+        batch_op.drop_index('ix_investments_date_of_valuation')
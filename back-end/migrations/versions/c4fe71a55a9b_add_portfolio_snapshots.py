@@ -0,0 +1,52 @@
+"""add portfolio snapshots
+
+Revision ID: c4fe71a55a9b
+Revises: 76400d2826fe
+Create Date: 2026-10-18 05:36:18.976750
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4fe71a55a9b'
+down_revision = '76400d2826fe'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('portfolio_snapshots',
+    sa.Column('valuation_date', sa.Date(), nullable=False),
+    sa.Column('portfolio', sa.String(length=15), nullable=False),
+    sa.Column('investment', sa.String(length=100), nullable=False),
+    sa.Column('total_units', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.Column('total_cost', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.Column('total_value', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('valuation_date', 'portfolio', 'investment')
+    )
+    with op.batch_alter_table('portfolio_snapshots', schema=None) as batch_op:
+        batch_op.create_index('ix_portfolio_snapshots_investment_date', ['investment', 'valuation_date'], unique=False)
+
+    # Backfill from existing history; `flask snapshots rebuild` does the same later on
+    op.execute("""
+        INSERT INTO portfolio_snapshots
+            (valuation_date, portfolio, investment, total_units, total_cost,
+             total_value, row_count, refreshed_at)
+        SELECT date(date_of_valuation), portfolio, investment,
+               COALESCE(SUM(units), 0), COALESCE(SUM(cost), 0),
+               COALESCE(SUM(value), 0), COUNT(*), CURRENT_TIMESTAMP
+        FROM investments
+        WHERE date_of_valuation IS NOT NULL
+        GROUP BY date(date_of_valuation), portfolio, investment
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('portfolio_snapshots', schema=None) as batch_op:
+        batch_op.drop_index('ix_portfolio_snapshots_investment_date')
+
+    op.drop_table('portfolio_snapshots')
@@ -1,60 +1,25 @@
-import csv
-from datetime import datetime
-from app import create_app, db
-from app.models.financial import Investments
+from app.services.context import ensure_app_context
+from app.services.ingest import DEFAULT_BATCH_SIZE, ingest_csv
 
-def populate_from_csv(full_path, portfolio_name,selected_date):
-    app = create_app()
-    
-    with app.app_context():
-        # Skip the first 10 rows
-        # Convert the date string to a datetime object if needed
-        if isinstance(selected_date, str):
-            try:
-                # Assuming the frontend sends YYYY-MM-DD format
-                date_obj = datetime.strptime(selected_date, '%Y-%m-%d').date()
-            except ValueError:
-                # Try ISO format if the above fails
-                date_obj = datetime.fromisoformat(selected_date.replace('Z', '+00:00')).date()
-        else:
-            date_obj = selected_date
-        
-        with open(full_path, 'r') as file:
-            for _ in range(10):
-                next(file)
-            
-            csv_reader = csv.DictReader(file)
-            rows = list(csv_reader)
-            
-            for row in rows:
-                # Skip empty rows or totals/footer rows
-                if not row['Stock'] or row['Stock'] == 'Totals' or not row['Code']:
-                    continue
-                
-                # Clean numeric values - remove commas
-                def clean_numeric(value):
-                    if value and value.strip():
-                        return float(value.replace(',', ''))
-                    return None
-                
-                statement = Investments(
-                    investment=row['Stock'],
-                    tracker_id=row['Code'],
-                    units=clean_numeric(row['Units held']),
-                    cost=clean_numeric(row['Cost (£)']),
-                    value=clean_numeric(row['Value (£)']),
-                    date_of_valuation=selected_date,
-                    portfolio= portfolio_name
-                )
-                
-                db.session.add(statement)
-            
-            db.session.commit()
-            print(f"Successfully populated records")
+
+def populate_from_csv(full_path, portfolio_name, selected_date, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Stream a broker CSV export into the investments table
+
+    Reuses the caller's app context when there is one and only builds an
+    app when run from the command line.
+
+    Returns:
+        dict: Rows inserted, elapsed seconds and rows/sec throughput
+    """
+    with ensure_app_context():
+        result = ingest_csv(full_path, portfolio_name, selected_date, batch_size)
+        print(f"Successfully populated {result['inserted']} records ({result['rows_per_sec']:,.0f} rows/sec)")
+        return result
 
 # if __name__ == '__main__':
 #     # filename = input("Enter filename (e.g., HL_ISA010825): ")
 #     # portfolio_name = input("Enter portfolio name (e.g., ISA): ")
-    
+
 #     # full_path = f'C:/Users/AndrewKnott/Projects/Investments/{filename}.csv'
 #     populate_from_csv(full_path, portfolio_name)
\ No newline at end of file
@@ -14,7 +14,8 @@ if __name__ == '__main__':
     port = int(os.environ.get('FLASK_PORT', 5000))
     host = os.environ.get('FLASK_HOST', '127.0.0.1')
     
-    # Run the application
+    # Run the application (development server; serve wsgi.py with
+    # gunicorn or waitress in production)
     app.run(
         debug=debug_mode,
         host=host,
@@ -1,4 +1,4 @@
-from app import create_app, db
+from app import db
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
@@ -7,16 +7,15 @@ from reportlab.lib.units import inch
 from datetime import datetime
 from sqlalchemy import text
 from populate_data import populate_from_csv
-import csv
-from app.models.financial import Investments
+from app.models.financial import PortfolioSnapshot
+from app.services.context import ensure_app_context
+from app.services.ingest import ingest_csv
 
 def import_csv_to_database(filename, portfolio_name):
     """
     Import CSV file to database - complete function
     """
-    app = create_app()
-    
-    with app.app_context():
+    with ensure_app_context():
         # Create table if it doesn't exist
         db.create_all()
         print("Database tables created/verified")
@@ -26,52 +25,16 @@ def import_csv_to_database(filename, portfolio_name):
         print(f"Opening file: {full_path}")
         
         try:
-            # Skip the first 10 rows (header information)
-            with open(full_path, 'r') as file:
-                for _ in range(10):
-                    next(file)
-                
-                csv_reader = csv.DictReader(file)
-                rows = list(csv_reader)
-                print(f"Found {len(rows)} rows in CSV")
-                
-                imported_count = 0
-                
-                for row in rows:
-                    # Skip empty rows or totals/footer rows
-                    if not row['Stock'] or row['Stock'] == 'Totals' or not row['Code']:
-                        continue
-                    
-                    # Clean numeric values - remove commas
-                    def clean_numeric(value):
-                        if value and value.strip():
-                            return float(value.replace(',', ''))
-                        return None
-                    
-                    # Create investment record
-                    statement = Investments(
-                        investment=row['Stock'],
-                        tracker_id=row['Code'],
-                        units=clean_numeric(row['Units held']),
-                        cost=clean_numeric(row['Cost (£)']),
-                        value=clean_numeric(row['Value (£)']),
-                        date_of_valuation=datetime.now(),
-                        portfolio=portfolio_name
-                    )
-                    
-                    db.session.add(statement)
-                    imported_count += 1
-                
-                # Commit all records at once
-                db.session.commit()
-                print(f"Successfully imported {imported_count} investment records to database")
-                
-                return {
-                    'success': True,
-                    'imported_count': imported_count,
-                    'filename': filename,
-                    'portfolio': portfolio_name
-                }
+            result = ingest_csv(full_path, portfolio_name, datetime.now())
+            imported_count = result['inserted']
+            print(f"Successfully imported {imported_count} investment records to database")
+            
+            return {
+                'success': True,
+                'imported_count': imported_count,
+                'filename': filename,
+                'portfolio': portfolio_name
+            }
                 
         except FileNotFoundError:
             error_msg = f"File not found: {full_path}"
@@ -79,7 +42,6 @@ def import_csv_to_database(filename, portfolio_name):
             return {'success': False, 'error': error_msg}
             
         except Exception as e:
-            db.session.rollback()  # Rollback on error
             error_msg = f"Error importing CSV: {str(e)}"
             print(error_msg)
             return {'success': False, 'error': error_msg}
@@ -101,8 +63,26 @@ def query_investment_data(selected_date=None):
    
     
     try:
-        # Build base query
-        query = db.session.query(Investments)
+        # Group by investment name and sum up units, costs, and values in SQL,
+        # reading the daily snapshot rollup rather than the raw rows
+        sum_units = db.func.coalesce(db.func.sum(PortfolioSnapshot.total_units), 0)
+        sum_cost = db.func.coalesce(db.func.sum(PortfolioSnapshot.total_cost), 0)
+        sum_value = db.func.coalesce(db.func.sum(PortfolioSnapshot.total_value), 0)
+        profit = sum_value - sum_cost
+        percent_return = db.type_coerce(
+            db.case((sum_cost > 0, profit / sum_cost * 100), else_=0), db.Float
+        )
+        
+        query = db.session.query(
+            PortfolioSnapshot.investment.label('stock_name'),
+            sum_units.label('total_units'),
+            sum_cost.label('total_cost'),
+            sum_value.label('total_value'),
+            profit.label('profit_pounds'),
+            percent_return.label('percent_return')
+        ).group_by(
+            PortfolioSnapshot.investment
+        )
         
         # Apply date filter if provided
         if selected_date:
@@ -110,52 +90,24 @@ def query_investment_data(selected_date=None):
             from datetime import datetime
             target_date = datetime.strptime(selected_date, '%Y-%m-%d').date()
             
-            # Filter by date (assuming date_of_valuation is stored as datetime)
-            query = query.filter(
-                db.func.date(Investments.date_of_valuation) == target_date
-            )
-        
-        # Execute query
-        investments = query.all()
-        
-        # Group by investment name and sum up units, costs, and values
-        investment_dict = {}
-        
-        for inv in investments:
-            stock_name = inv.investment
-            cost = float(inv.cost or 0)
-            value = float(inv.value or 0)
-            units = float(inv.units or 0)
-            
-            if stock_name not in investment_dict:
-                investment_dict[stock_name] = {
-                    'total_units': 0,
-                    'total_cost': 0,
-                    'total_value': 0
-                }
-            
-            investment_dict[stock_name]['total_units'] += units
-            investment_dict[stock_name]['total_cost'] += cost
-            investment_dict[stock_name]['total_value'] += value
+            query = query.filter(PortfolioSnapshot.valuation_date == target_date)
         
-        # Convert to list format and calculate profits/returns
+        # Only the aggregate rows come back - one per holding
         investment_data = []
         total_cost = 0
         total_value = 0
         
-        for stock_name, data in investment_dict.items():
-            cost = data['total_cost']
-            value = data['total_value']
-            profit = value - cost
-            percent_return = (profit / cost * 100) if cost > 0 else 0
+        for row in query:
+            cost = float(row.total_cost)
+            value = float(row.total_value)
             
             investment_data.append({
-                'stock_name': stock_name,
-                'total_units': data['total_units'],
+                'stock_name': row.stock_name,
+                'total_units': float(row.total_units),
                 'total_cost': cost,
                 'total_value': value,
-                'profit_pounds': profit,
-                'percent_return': percent_return
+                'profit_pounds': float(row.profit_pounds),
+                'percent_return': float(row.percent_return)
             })
             
             total_cost += cost
@@ -183,7 +135,7 @@ def generate_pdf_from_sql_data(output_filename="investment_report.pdf", investme
     Generate PDF report using the raw SQL data
     
     Args:
-        output_filename: Name of the output PDF file
+        output_filename: Name of the output PDF file, or a writable binary buffer
         investment_data: Pre-fetched investment data (optional)
         totals: Pre-calculated totals (optional)
         selected_date: Date filter in YYYY-MM-DD format (optional)
@@ -336,5 +288,6 @@ if __name__ == '__main__':
     
     # Option 2: Generate PDF report
     print("\n=== GENERATING PDF ===")
-    pdf_file = generate_pdf_from_sql_data("my_investment_report.pdf")
+    with ensure_app_context():
+        pdf_file = generate_pdf_from_sql_data("my_investment_report.pdf")
     print(f"PDF saved as: {pdf_file}")
\ No newline at end of file
@@ -0,0 +1,23 @@
+import pytest
+from app import create_app, db
+from app.config import TestingConfig
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """App on a scratch SQLite file, so background threads share the data"""
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr(TestingConfig, 'REPORT_CACHE_DIR', str(tmp_path / 'report_cache'))
+    monkeypatch.setattr(TestingConfig, 'INVESTMENT_FILES_DIR', str(tmp_path / 'exports'))
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,105 @@
+from datetime import date
+
+import numpy as np
+import pytest
+from sqlalchemy import insert
+
+from app import db
+from app.models.financial import PortfolioSnapshot
+from app.services.analytics import compute_metrics, load_valuation_matrix, portfolio_analytics
+
+D1, D2, D3 = date(2024, 1, 5), date(2024, 1, 12), date(2024, 1, 19)
+
+
+def add_snapshots(*rows):
+    db.session.execute(insert(PortfolioSnapshot), [
+        {
+            'valuation_date': day, 'portfolio': portfolio, 'investment': investment,
+            'total_units': units, 'total_cost': cost, 'total_value': value, 'row_count': 1
+        }
+        for day, portfolio, investment, units, cost, value in rows
+    ])
+    db.session.commit()
+
+
+def test_empty_history(app):
+    metrics = portfolio_analytics()
+    assert metrics['dates'] == []
+    assert metrics['summary'] is None
+
+
+def test_modified_dietz_with_a_purchase():
+    dates = [D1, D2]
+    values = np.array([[100.0], [160.0]])
+    costs = np.array([[100.0], [150.0]])
+    metrics = compute_metrics(dates, ['A'], values, costs)
+    # 10 gain on 100 opening value plus half the 50 paid in
+    assert metrics['period_returns'][1] == pytest.approx(10 / 125 * 100)
+    assert metrics['summary']['time_weighted_return'] == pytest.approx(10 / 125 * 100)
+
+
+def test_disposal_is_valued_at_market(app):
+    add_snapshots(
+        (D1, 'ISA', 'A', 10, 80, 100),
+        (D1, 'ISA', 'B', 5, 40, 60),
+        (D2, 'ISA', 'A', 10, 80, 110)
+    )
+    _, holdings, _, _, flows = load_valuation_matrix()
+    assert holdings == ['A', 'B']
+    assert flows.tolist() == [[0.0, -60.0]]
+
+    metrics = portfolio_analytics()
+    # Only A's rise is performance; B left at its last value, not its cost
+    assert metrics['period_returns'][1] == pytest.approx(10 / (160 - 30) * 100)
+    gains = {c['investment']: c['gain'] for c in metrics['contributions']}
+    assert gains == {'A': pytest.approx(10), 'B': pytest.approx(0)}
+
+
+def test_partial_sale_pays_out_at_closing_price(app):
+    add_snapshots(
+        (D1, 'ISA', 'A', 10, 50, 100),
+        (D2, 'ISA', 'A', 4, 20, 48)
+    )
+    metrics = portfolio_analytics()
+    # Six units sold at 12 = 72 out; the 10 held all rose from 10 to 12
+    assert metrics['contributions'][0]['gain'] == pytest.approx(20)
+    assert metrics['period_returns'][1] == pytest.approx(20 / (100 - 36) * 100)
+
+
+def test_portfolios_valued_on_different_dates(app):
+    add_snapshots(
+        (D1, 'ISA', 'A', 10, 80, 100),
+        (D1, 'SIPP', 'B', 20, 150, 200),
+        (D2, 'SIPP', 'B', 20, 150, 200),
+        (D3, 'ISA', 'A', 10, 80, 100),
+        (D3, 'SIPP', 'B', 20, 150, 200)
+    )
+    dates, _, values, _, _ = load_valuation_matrix()
+    assert dates == [D1, D2, D3]
+    # ISA was not valued on D2, so A keeps its D1 value rather than dropping to zero
+    assert values.sum(axis=1).tolist() == [300.0, 300.0, 300.0]
+
+    metrics = portfolio_analytics()
+    assert metrics['period_returns'][1:] == [pytest.approx(0), pytest.approx(0)]
+    assert metrics['summary']['max_drawdown'] == pytest.approx(0)
+
+
+def test_portfolio_first_valued_later_is_not_a_gain(app):
+    add_snapshots(
+        (D1, 'ISA', 'A', 10, 80, 100),
+        (D2, 'ISA', 'A', 10, 80, 100),
+        (D2, 'SIPP', 'B', 20, 50, 200)
+    )
+    metrics = portfolio_analytics()
+    assert metrics['period_returns'][1] == pytest.approx(0)
+
+
+def test_drawdown_and_contributions():
+    dates = [D1, D2, D3]
+    values = np.array([[100.0, 100.0], [80.0, 100.0], [90.0, 110.0]])
+    costs = np.full((3, 2), 100.0)
+    summary = compute_metrics(dates, ['A', 'B'], values, costs)['summary']
+    assert summary['max_drawdown'] == pytest.approx(-10.0)
+    assert summary['max_drawdown_peak'] == D1.isoformat()
+    assert summary['max_drawdown_trough'] == D2.isoformat()
+    assert summary['time_weighted_return'] == pytest.approx((0.9 * (1 + 20 / 180) - 1) * 100)
@@ -0,0 +1,55 @@
+import json
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from app import db
+from app.json_provider import embedded_json_response
+from app.models.financial import Investments
+from app.services.history import company_history_json
+
+
+def add_valuations(company, *valuations):
+    db.session.execute(insert(Investments), [
+        {'portfolio': 'ISA', 'investment': company, 'tracker_id': 'ACME', 'units': 1, 'cost': 1,
+         'value': value, 'date_of_valuation': valued_at}
+        for valued_at, value in valuations
+    ])
+    db.session.commit()
+
+
+def test_company_history_is_date_ordered(client):
+    # Inserted newest first, so table order is not date order
+    add_valuations(
+        'Acme plc',
+        (datetime(2024, 3, 1), 30),
+        (datetime(2024, 1, 1), 10),
+        (datetime(2024, 2, 1), None)
+    )
+    expected = [
+        {'date': '2024-01-01', 'value': 10},
+        {'date': '2024-02-01', 'value': 0},
+        {'date': '2024-03-01', 'value': 30}
+    ]
+
+    body = client.get('/api/investment-history/Acme plc').get_json()
+    assert body['success'] is True
+    assert body['company'] == 'Acme plc'
+    assert body['data'] == expected
+
+    raw = company_history_json('Acme plc')
+    if raw is not None:
+        assert json.loads(raw) == expected
+
+
+def test_unknown_company_has_empty_history(client):
+    body = client.get('/api/investment-history/Nobody').get_json()
+    assert body == {'success': True, 'company': 'Nobody', 'data': []}
+
+
+def test_embedded_json_response_is_valid_json(app):
+    response = embedded_json_response('data', '[{"a": 1}]', success=True, note='}')
+    assert json.loads(response.get_data()) == {'success': True, 'note': '}', 'data': [{'a': 1}]}
+
+    response = embedded_json_response('data', '[]')
+    assert json.loads(response.get_data()) == {'data': []}
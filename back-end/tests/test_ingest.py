@@ -0,0 +1,77 @@
+import os
+
+import pytest
+from sqlalchemy import func, select
+
+from app import db
+from app.models.financial import Investments, PortfolioSnapshot
+from app.services.ingest import ingest_csv
+from benchmarks.synthetic import SyntheticPortfolio
+
+
+@pytest.fixture
+def portfolio():
+    return SyntheticPortfolio(holdings=25, dates=2, portfolios=1, seed=7)
+
+
+def count(model):
+    return db.session.execute(select(func.count()).select_from(model)).scalar()
+
+
+def test_ingest_writes_every_holding_in_batches(app, tmp_path, portfolio):
+    path = portfolio.write_csv(tmp_path / 'export.csv', 'ISA', 0)
+    result = ingest_csv(path, 'ISA', portfolio.dates[0].isoformat(), batch_size=7)
+
+    assert result['inserted'] == 25
+    assert count(Investments) == 25
+    # Header block and Totals row are not holdings
+    assert db.session.execute(
+        select(func.count()).where(Investments.investment == 'Totals')
+    ).scalar() == 0
+
+    code, name, units, _, value, cost = next(portfolio.positions('ISA', 0))
+    row = db.session.execute(select(Investments).where(Investments.tracker_id == code)).scalar_one()
+    assert (row.investment, row.portfolio) == (name, 'ISA')
+    assert (float(row.units), float(row.value), float(row.cost)) == (units, value, cost)
+    assert row.date_of_valuation.date() == portfolio.dates[0]
+
+
+def test_ingest_refreshes_the_snapshot_rollup(app, tmp_path, portfolio):
+    for d in range(2):
+        path = portfolio.write_csv(tmp_path / f'export_{d}.csv', 'ISA', d)
+        ingest_csv(path, 'ISA', portfolio.dates[d])
+
+    assert count(PortfolioSnapshot) == 50
+    total = db.session.execute(
+        select(func.sum(PortfolioSnapshot.total_value)).where(PortfolioSnapshot.valuation_date == portfolio.dates[1])
+    ).scalar()
+    expected = sum(value for *_, value, _ in portfolio.positions('ISA', 1))
+    assert float(total) == pytest.approx(expected)
+
+
+def test_failed_ingest_rolls_back(app, tmp_path, portfolio):
+    path = portfolio.write_csv(tmp_path / 'export.csv', 'ISA', 0)
+    with open(path, 'a') as file:
+        file.write('BAD,Broken Holding plc,not-a-number,1,1,1,0,0\n')
+
+    with pytest.raises(ValueError):
+        ingest_csv(path, 'ISA', portfolio.dates[0], batch_size=10)
+    assert count(Investments) == 0
+    assert count(PortfolioSnapshot) == 0
+
+
+def test_process_investment_route(app, client, portfolio):
+    directory = app.config['INVESTMENT_FILES_DIR']
+    os.makedirs(directory)
+    portfolio.write_csv(os.path.join(directory, 'HL_ISA.csv'), 'ISA', 0)
+
+    response = client.post('/api/process-investment', json={
+        'filename': 'HL_ISA.csv', 'portfolio': 'ISA', 'date': portfolio.dates[0].isoformat()
+    })
+    assert response.status_code == 200
+    assert response.get_json()['data']['rows_inserted'] == 25
+
+    response = client.post('/api/process-investment', json={
+        'filename': '../HL_ISA.csv', 'portfolio': 'ISA', 'date': portfolio.dates[0].isoformat()
+    })
+    assert response.status_code == 400
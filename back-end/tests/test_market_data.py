@@ -0,0 +1,119 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app import db
+from app.models.financial import DailyPrice, PriceSymbol
+from app.services.market_data import TokenBucket, get_price_store
+from benchmarks.stub_alpha_vantage import OUTPUT_DAYS, StubAlphaVantage
+
+
+@pytest.fixture
+def stub(app):
+    """Local Alpha Vantage stand-in the app is pointed at; no network"""
+    stub = StubAlphaVantage(latency=0.05).start()
+    app.config['ALPHA_VANTAGE_URL'] = stub.url
+    yield stub
+    stub.stop()
+
+
+def stored_bars(symbol):
+    return db.session.query(db.func.count()).select_from(DailyPrice).filter(DailyPrice.symbol == symbol).scalar()
+
+
+def make_stale(symbol, days=3):
+    db.session.execute(
+        update(PriceSymbol).where(PriceSymbol.symbol == symbol).values(
+            fetched_at=datetime.utcnow() - timedelta(days=days)
+        )
+    )
+    db.session.commit()
+
+
+def test_first_request_backfills_full_history(client, stub):
+    response = client.get('/api/stock-data/IBM')
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body['cached'] is False
+    assert body['count'] == 100
+    assert stub.requests == [('IBM', 'full')]
+    assert stored_bars('IBM') == OUTPUT_DAYS['full']
+
+    # Fresh until the next market close: answered from the store
+    body = client.get('/api/stock-data/IBM?outputsize=full').get_json()
+    assert body['cached'] is True
+    assert body['count'] == OUTPUT_DAYS['full']
+    assert stub.calls['IBM'] == 1
+
+
+def test_stale_symbol_fetches_only_the_compact_delta(client, stub):
+    client.get('/api/stock-data/IBM')
+    make_stale('IBM')
+
+    body = client.get('/api/stock-data/IBM').get_json()
+    assert body['cached'] is False
+    assert stub.requests == [('IBM', 'full'), ('IBM', 'compact')]
+    # The compact bars overlap the backfill and are merged, not duplicated
+    assert stored_bars('IBM') == OUTPUT_DAYS['full']
+
+
+def test_date_range_is_served_from_the_store(client, stub):
+    client.get('/api/stock-data/IBM')
+    end = datetime.utcnow().date()
+    start = end - timedelta(days=9)
+    body = client.get(f'/api/stock-data/IBM?start={start}&end={end}').get_json()
+    assert body['count'] == 10
+    assert stub.calls['IBM'] == 1
+
+
+def test_concurrent_requests_share_one_upstream_fetch(app, stub):
+    stub.latency = 0.3
+    store = get_price_store()
+    results = []
+
+    def load():
+        with app.app_context():
+            series, _ = store.get_daily('MSFT')
+            results.append(len(series['bars']))
+
+    threads = [threading.Thread(target=load) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [100] * 6
+    assert stub.calls['MSFT'] == 1
+
+
+def test_invalid_symbol_is_a_client_error(client, stub):
+    response = client.get('/api/stock-data/INVALID1')
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_token_bucket_allows_a_burst_then_throttles():
+    bucket = TokenBucket(rate=20, capacity=3)
+    assert all(bucket.acquire(0) for _ in range(3))
+    assert bucket.acquire(0) is False
+
+    started = time.monotonic()
+    assert bucket.acquire(1)
+    assert time.monotonic() - started == pytest.approx(1 / 20, abs=0.04)
+
+
+def test_rate_limited_upstream_answers_429(app, client, stub):
+    app.config.update(ALPHA_VANTAGE_CALLS_PER_MINUTE=1, ALPHA_VANTAGE_BURST=1, ALPHA_VANTAGE_RATE_WAIT=0)
+    assert client.get('/api/stock-data/IBM').status_code == 200
+    response = client.get('/api/stock-data/MSFT')
+    assert response.status_code == 429
+    assert 'MSFT' not in stub.calls
+
+    # A stale symbol already in the store is served rather than failing
+    make_stale('IBM')
+    body = client.get('/api/stock-data/IBM').get_json()
+    assert body['success'] is True
+    assert stub.calls['IBM'] == 1
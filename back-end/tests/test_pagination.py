@@ -0,0 +1,63 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select, update
+
+from app import db
+from app.models.financial import FinancialStatement
+from benchmarks.synthetic import seed_statements
+
+
+def walk(client, url):
+    """Follow next_cursor to the end; returns every row and the page sizes"""
+    rows, sizes, cursor = [], [], None
+    while True:
+        page = client.get(url + (f'&cursor={cursor}' if cursor else '')).get_json()
+        assert page['success'] is True
+        rows += page['data']
+        sizes.append(page['count'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            return rows, sizes
+
+
+def test_statement_pages_cover_every_row_once_newest_first(app, client):
+    seed_statements(25, kpis_per_statement=0)
+    # Ties on upload_date must still page by id
+    db.session.execute(update(FinancialStatement).values(upload_date=datetime(2024, 1, 1)))
+    db.session.execute(
+        update(FinancialStatement).where(FinancialStatement.id > 20).values(upload_date=datetime(2024, 2, 1))
+    )
+    db.session.commit()
+
+    rows, sizes = walk(client, '/api/statements?limit=10')
+    assert sizes == [10, 10, 5]
+    ids = [row['id'] for row in rows]
+    assert ids == [25, 24, 23, 22, 21] + list(range(20, 0, -1))
+
+
+def test_field_projection(client):
+    seed_statements(3, kpis_per_statement=0)
+    page = client.get('/api/statements?fields=company_name&limit=2').get_json()
+    assert [set(row) for row in page['data']] == [{'company_name'}] * 2
+    assert page['next_cursor'] is not None
+
+    rows, _ = walk(client, '/api/statements?fields=company_name&limit=2')
+    assert len(rows) == 3
+
+
+def test_kpi_pages(client):
+    seed_statements(2, kpis_per_statement=7)
+    statement_id = db.session.execute(select(FinancialStatement.id).limit(1)).scalar()
+    rows, sizes = walk(client, f'/api/statements/{statement_id}/kpis?limit=3')
+    assert sizes == [3, 3, 1]
+    ids = [row['id'] for row in rows]
+    assert ids == sorted(ids)
+    assert {row['statement_id'] for row in rows} == {statement_id}
+
+
+@pytest.mark.parametrize('query', ['cursor=not-a-cursor', 'limit=0', 'limit=100000', 'fields=id,password'])
+def test_invalid_page_arguments(client, query):
+    response = client.get(f'/api/statements?{query}')
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+from app import create_app
+from app.config import TestingConfig
+from app.services.profiling import PROFILE_HEADER, profile_token
+
+
+def test_header_mode_refuses_the_placeholder_secret_key(monkeypatch):
+    monkeypatch.setattr(TestingConfig, 'PROFILE_MODE', 'header')
+    with pytest.raises(ValueError, match='SECRET_KEY'):
+        create_app('testing')
+
+
+def test_header_mode_profiles_signed_requests(monkeypatch, tmp_path):
+    monkeypatch.setattr(TestingConfig, 'PROFILE_MODE', 'header')
+    monkeypatch.setattr(TestingConfig, 'PROFILE_DIR', str(tmp_path))
+    monkeypatch.setattr(TestingConfig, 'SECRET_KEY', 'a-private-test-key')
+    client = create_app('testing').test_client()
+
+    assert 'X-Profile-File' not in client.get('/health').headers
+    forged = profile_token('dev-secret-key-change-in-production', '/health')
+    assert 'X-Profile-File' not in client.get('/health', headers={PROFILE_HEADER: forged}).headers
+
+    token = profile_token('a-private-test-key', '/health')
+    name = client.get('/health', headers={PROFILE_HEADER: token}).headers['X-Profile-File']
+    assert os.listdir(tmp_path) == [name]
+
+
+def test_all_mode_keeps_only_the_newest_profiles(monkeypatch, tmp_path):
+    monkeypatch.setattr(TestingConfig, 'PROFILE_MODE', 'all')
+    monkeypatch.setattr(TestingConfig, 'PROFILE_DIR', str(tmp_path))
+    monkeypatch.setattr(TestingConfig, 'PROFILE_MAX_FILES', 3)
+    client = create_app('testing').test_client()
+
+    names = [client.get('/health').headers['X-Profile-File'] for _ in range(5)]
+    assert sorted(os.listdir(tmp_path)) == names[-3:]
@@ -0,0 +1,86 @@
+import os
+import time
+
+import pytest
+
+from app.services.ingest import ingest_csv
+from app.services.report_jobs import ReportJobQueue, ReportQueueFull, get_report_jobs
+from benchmarks.synthetic import SyntheticPortfolio
+
+
+def wait_for(client, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f'/api/reports/{job_id}').get_json()['job']
+        if job['status'] in ('finished', 'failed'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f'Report job {job_id} did not finish')
+
+
+def test_report_job_renders_and_downloads(client, tmp_path):
+    portfolio = SyntheticPortfolio(holdings=5, dates=1, portfolios=1)
+    ingest_csv(portfolio.write_csv(tmp_path / 'export.csv', 'ISA', 0), 'ISA', portfolio.dates[0])
+
+    response = client.post('/api/reports', json={'date': portfolio.dates[0].isoformat()})
+    assert response.status_code == 202
+    job = wait_for(client, response.get_json()['job']['id'])
+    assert job['status'] == 'finished'
+
+    download = client.get(job['download_url'])
+    assert download.status_code == 200
+    assert download.mimetype == 'application/pdf'
+    assert download.get_data().startswith(b'%PDF')
+
+
+def test_unknown_and_corrupt_jobs_answer_json(app, client):
+    assert client.get('/api/reports/not-a-job').status_code == 404
+
+    directory = get_report_jobs().directory
+    half_written = 'a' * 32
+    with open(os.path.join(directory, f'{half_written}.json'), 'w') as file:
+        file.write('{"id": "aaaa')
+    assert client.get(f'/api/reports/{half_written}').status_code == 404
+
+    corrupt = 'b' * 32
+    with open(os.path.join(directory, f'{corrupt}.json'), 'w') as file:
+        file.write('{"id": "%s"}' % corrupt)
+    for url in (f'/api/reports/{corrupt}', f'/api/reports/{corrupt}/download'):
+        response = client.get(url)
+        assert response.status_code == 500
+        assert response.get_json()['success'] is False
+
+
+@pytest.fixture
+def queue(app, tmp_path):
+    return ReportJobQueue(app, tmp_path / 'jobs', max_workers=1, max_pending=1, retention=60)
+
+
+def test_slot_is_released_when_a_job_cannot_be_saved(queue, monkeypatch):
+    def fail(job):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(queue, '_save', fail)
+    with pytest.raises(OSError):
+        queue.submit('2024-01-02')
+    assert queue._jobs == {}
+    assert queue._slots.acquire(blocking=False)
+
+
+def test_slot_is_released_when_the_running_update_fails(queue, monkeypatch):
+    saved = queue._save
+
+    def fail_when_running(job):
+        if job['status'] == 'running':
+            raise OSError('disk full')
+        saved(job)
+
+    monkeypatch.setattr(queue, '_save', fail_when_running)
+    job = queue.submit('2024-01-02')
+    queue._executor.shutdown(wait=True)
+    assert queue.get(job['id'])['status'] == 'failed'
+
+    # The single pending slot is free again
+    assert queue._slots.acquire(blocking=False)
+    with pytest.raises(ReportQueueFull):
+        queue.submit('2024-01-03')
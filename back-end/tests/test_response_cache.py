@@ -0,0 +1,75 @@
+import pytest
+
+from app import create_app, db
+from app.models.financial import FinancialStatement
+from app.services.ingest import ingest_csv
+from benchmarks.synthetic import SyntheticPortfolio
+
+
+@pytest.fixture
+def portfolio():
+    return SyntheticPortfolio(holdings=5, dates=3, portfolios=1, seed=3)
+
+
+def ingest(portfolio, tmp_path, d):
+    path = portfolio.write_csv(tmp_path / f'export_{d}.csv', 'ISA', d)
+    ingest_csv(path, 'ISA', portfolio.dates[d])
+
+
+def test_unchanged_data_answers_304(client, portfolio, tmp_path):
+    ingest(portfolio, tmp_path, 0)
+    first = client.get('/api/unique-dates')
+    assert first.status_code == 200
+    assert first.headers['Cache-Control'] == 'no-cache'
+
+    again = client.get('/api/unique-dates', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+
+    since = client.get('/api/unique-dates', headers={'If-Modified-Since': first.headers['Last-Modified']})
+    assert since.status_code == 304
+
+
+def test_ingest_invalidates_etag_and_cached_body(client, portfolio, tmp_path):
+    ingest(portfolio, tmp_path, 0)
+    first = client.get('/api/unique-dates')
+
+    ingest(portfolio, tmp_path, 1)
+    after = client.get('/api/unique-dates', headers={'If-None-Match': first.headers['ETag']})
+    assert after.status_code == 200
+    assert after.headers['ETag'] != first.headers['ETag']
+    assert portfolio.dates[1].isoformat() in after.get_json()['dates']
+
+
+def test_orm_writes_invalidate(client):
+    first = client.get('/api/statements')
+    client.post('/api/statements', json={'file_name': 'q1.pdf', 'company_name': 'Acme'})
+
+    after = client.get('/api/statements', headers={'If-None-Match': first.headers['ETag']})
+    assert after.status_code == 200
+    assert [row['file_name'] for row in after.get_json()['data']] == ['q1.pdf']
+
+
+def test_rolled_back_writes_keep_the_etag(app, client):
+    first = client.get('/api/statements')
+    db.session.add(FinancialStatement(file_name='draft.pdf'))
+    db.session.flush()
+    db.session.rollback()
+
+    again = client.get('/api/statements', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+
+
+def test_writes_by_another_worker_invalidate(app, client, portfolio, tmp_path):
+    # A second app on the same database stands in for another worker process
+    ingest(portfolio, tmp_path, 0)
+    first = client.get('/api/unique-dates')
+
+    other = create_app('testing')
+    with other.app_context():
+        ingest(portfolio, tmp_path, 1)
+        db.session.remove()
+        db.engine.dispose()
+
+    after = client.get('/api/unique-dates', headers={'If-None-Match': first.headers['ETag']})
+    assert after.status_code == 200
+    assert portfolio.dates[1].isoformat() in after.get_json()['dates']
@@ -0,0 +1,36 @@
+"""
+Production WSGI entry point
+
+    gunicorn -c gunicorn.conf.py wsgi:app      (Linux/macOS: worker processes x threads)
+    python wsgi.py                             (any OS: waitress, or a threaded Werkzeug server)
+
+Uses ProductionConfig unless FLASK_ENV says otherwise: no debugger or
+reloader, no SQL echo, and a pre-warmed, tuned connection pool per worker.
+
+Running several worker processes is safe: cache validation and report
+jobs are shared through the database and REPORT_CACHE_DIR. The Alpha
+Vantage rate limit is enforced per process, though; see gunicorn.conf.py.
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app import create_app
+
+app = create_app(os.environ.get('FLASK_ENV') or 'production')
+
+if __name__ == '__main__':
+    host = os.environ.get('FLASK_HOST', '127.0.0.1')
+    port = int(os.environ.get('FLASK_PORT', 5000))
+    threads = int(os.environ.get('WSGI_THREADS', 8))
+
+    try:
+        from waitress import serve
+    except ImportError:
+        from werkzeug.serving import run_simple
+        print(f"waitress not installed; serving on a threaded Werkzeug server at http://{host}:{port}")
+        run_simple(host, port, app, threaded=True)
+    else:
+        print(f"Serving with waitress ({threads} threads) at http://{host}:{port}")
+        serve(app, host=host, port=port, threads=threads)
@@ -1,6 +1,8 @@
 import { Link } from 'react-router-dom';
 import React, { useState, useEffect } from 'react';
 
+const POLL_INTERVAL_MS = 1000;
+
 export default function ReportGenerator() {
     const [generatingPdf, setGeneratingPdf] = useState(false);
     const [uniqueDates, setUniqueDates] = useState([]);
@@ -49,31 +51,47 @@ export default function ReportGenerator() {
         }
     };
 
+    const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
     const handleGeneratePdf = async (selectedDate = null) => {
         console.log(`Starting PDF generation for date: ${selectedDate || 'all dates'}...`);
         setGeneratingPdf(true);
 
         try {
-            // Build URL with optional date parameter
-            let url = 'http://localhost:5000/api/generate-pdf';
-            if (selectedDate) {
-                url += `?date=${selectedDate}`;
+            // Queue the report; the API renders it in the background
+            const response = await fetch('http://localhost:5000/api/reports', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(selectedDate ? { date: selectedDate } : {}),
+            });
+
+            const queued = await response.json();
+            if (!response.ok || !queued.success) {
+                throw new Error(queued.error || `HTTP error! status: ${response.status}`);
             }
-            
-            console.log("Fetching from:", url);
 
-            const response = await fetch(url, {
-                method: 'GET',
-            });
+            // Poll the job until the PDF is ready
+            let job = queued.job;
+            while (job.status === 'queued' || job.status === 'running') {
+                await sleep(POLL_INTERVAL_MS);
+                const statusResponse = await fetch(`http://localhost:5000${job.status_url}`);
+                const status = await statusResponse.json();
+                if (!statusResponse.ok || !status.success) {
+                    throw new Error(status.error || `HTTP error! status: ${statusResponse.status}`);
+                }
+                job = status.job;
+            }
 
-            console.log("Response received:", response);
-            console.log("Response status:", response.status);
+            if (job.status !== 'finished') {
+                throw new Error(job.error || 'Report generation failed');
+            }
 
-            if (!response.ok) {
-                throw new Error(`HTTP error! status: ${response.status}`);
+            const pdfResponse = await fetch(`http://localhost:5000${job.download_url}`);
+            if (!pdfResponse.ok) {
+                throw new Error(`HTTP error! status: ${pdfResponse.status}`);
             }
 
-            const blob = await response.blob();
+            const blob = await pdfResponse.blob();
             console.log("Blob created:", blob);
 
             const downloadUrl = window.URL.createObjectURL(blob);